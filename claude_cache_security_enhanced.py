@@ -5,36 +5,66 @@ Optimized for large-scale security analysis with git integration
 """
 
 import os
+import sys
 import json
 import hashlib
 import gzip
+import zlib
 import time
 import sqlite3
 import logging
 import glob
 import psutil
 import gc
+import math
+import itertools
+import sched
 import asyncio
-import aiofiles
-import aiosqlite
 import subprocess
 import re
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple, Any, Set, Union
+from typing import Optional, Dict, List, Tuple, Any, Set, Union, Iterator, Iterable, Callable
 from dataclasses import dataclass, asdict, field
 from datetime import datetime, timedelta
 from contextlib import contextmanager, asynccontextmanager
-from threading import Lock, Event
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from threading import Lock, RLock, Event, Thread, local, get_ident
+from concurrent.futures import Future, ThreadPoolExecutor
 import queue
+import weakref
 import mimetypes
 import mmap
-from cachetools import LRUCache, TTLCache
-from collections import defaultdict
+import stat
+from collections import defaultdict, OrderedDict
 import numpy as np
 from enum import Enum
 import git  # GitPython for git integration
 
+try:
+    import hyperscan  # multi-pattern DFA matcher
+except ImportError:
+    hyperscan = None
+
+try:
+    import re2  # linear-time multi-pattern matching when Hyperscan is missing
+except ImportError:
+    re2 = None
+
+try:
+    import orjson  # Rust-backed JSON, encodes straight to bytes
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash  # non-cryptographic hash for partition placement
+except ImportError:
+    xxhash = None
+
+try:
+    import zstandard  # faster than gzip at a better ratio
+except ImportError:
+    zstandard = None
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -42,6 +72,102 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Schema of each partition database, shared with maintenance commands
+PARTITION_CACHE_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS partition_cache (
+        path TEXT PRIMARY KEY,
+        content BLOB,
+        compressed BOOLEAN,
+        compression TEXT,
+        size INTEGER,
+        checksum TEXT,
+        FOREIGN KEY (path) REFERENCES security_cache(path)
+    );
+    CREATE INDEX IF NOT EXISTS idx_path ON partition_cache(path);
+    
+    -- Running totals of the partition, kept by the triggers below so they
+    -- never need a scan; the single row is seeded from existing content
+    CREATE TABLE IF NOT EXISTS partition_stats (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        file_count INTEGER NOT NULL,
+        total_size INTEGER NOT NULL
+    );
+    INSERT INTO partition_stats (id, file_count, total_size)
+        SELECT 0, (SELECT COUNT(*) FROM partition_cache),
+               (SELECT COALESCE(SUM(size), 0) FROM partition_cache)
+        WHERE NOT EXISTS (SELECT 1 FROM partition_stats);
+    
+    CREATE TRIGGER IF NOT EXISTS partition_stats_insert AFTER INSERT ON partition_cache BEGIN
+        UPDATE partition_stats SET file_count = file_count + 1,
+                                   total_size = total_size + COALESCE(NEW.size, 0);
+    END;
+    CREATE TRIGGER IF NOT EXISTS partition_stats_delete AFTER DELETE ON partition_cache BEGIN
+        UPDATE partition_stats SET file_count = file_count - 1,
+                                   total_size = total_size - COALESCE(OLD.size, 0);
+    END;
+    CREATE TRIGGER IF NOT EXISTS partition_stats_update AFTER UPDATE OF size ON partition_cache BEGIN
+        UPDATE partition_stats SET total_size = total_size - COALESCE(OLD.size, 0) + COALESCE(NEW.size, 0);
+    END;
+'''
+
+# Checksums are computed over slices of this size, so mapped files are
+# hashed in place rather than copied into one bytes object first
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# The writer thread commits queued entries in transactions of up to this
+# many files, waiting at most this long for a batch to fill
+WRITE_BATCH_SIZE = 1000
+WRITE_FLUSH_INTERVAL = 0.5
+
+# Files handed to warm-up workers but not yet collected, per worker
+WARM_IN_FLIGHT_PER_WORKER = 4
+
+# Default number of warm-up workers: reads and hashing release the GIL,
+# so two per CPU keep the disk busy without oversubscribing
+DEFAULT_WARM_WORKERS = min(32, 2 * (os.cpu_count() or 1))
+
+# Compression level for zstd-compressed content
+ZSTD_LEVEL = 3
+
+# Prepared statements kept per connection; every query text in this
+# module fits comfortably
+SQLITE_CACHED_STATEMENTS = 256
+
+# Compressed blobs are inflated from incremental blob reads of this size
+# where sqlite3 supports them (Python 3.11+), rather than fetched whole
+SQLITE_BLOB_IO = hasattr(sqlite3.Connection, 'blobopen')
+BLOB_READ_SIZE = 64 * 1024
+
+# DELETE ... RETURNING (SQLite 3.35+) reports a removed row's partition in
+# the same statement that removes it
+SQLITE_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# WAL pages after which a commit checkpoints; turned off for the length
+# of a warm-up, which checkpoints once at the end instead
+WAL_AUTOCHECKPOINT = 10000
+
+# Databases one connection can attach (SQLite's default SQLITE_MAX_ATTACHED)
+SQLITE_MAX_ATTACHED = 10
+
+# Trained zstd dictionary: its size and how many cached files to sample
+ZSTD_DICT_SIZE = 128 * 1024
+ZSTD_DICT_SAMPLES = 1000
+# Training reads at most this much of each sampled file, and this much in total
+ZSTD_DICT_SAMPLE_BYTES = 128 * 1024
+ZSTD_DICT_TRAINING_BYTES = 100 * ZSTD_DICT_SIZE
+
+# When the entry cache is full, the eviction victim is picked among this
+# share of least recently used entries, but never more than the cap
+EVICTION_SAMPLE_FRACTION = 0.1
+EVICTION_SAMPLE_MAX = 32
+
+# Entries held in the memory caches carry no per-instance __dict__ where
+# dataclasses support slots (Python 3.10+)
+ENTRY_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Security score deducted per finding; other severities cost 5
+SEVERITY_PENALTIES = {"CRITICAL": 30.0, "HIGH": 20.0, "MEDIUM": 10.0}
+
 class FileType(Enum):
     """File types for optimized handling"""
     SOURCE_CODE = "source"
@@ -51,6 +177,17 @@ class FileType(Enum):
     DATA = "data"
     SECURITY_SENSITIVE = "security"
 
+# File type by extension, and by name for files without a telling extension
+EXTENSION_FILE_TYPES: Dict[str, FileType] = {
+    **dict.fromkeys(('.py', '.js', '.ts', '.java', '.cs', '.go', '.php', '.rb', '.c', '.cpp', '.rs'),
+                    FileType.SOURCE_CODE),
+    **dict.fromkeys(('.yml', '.yaml', '.json', '.xml', '.conf', '.ini', '.toml'), FileType.CONFIG),
+    **dict.fromkeys(('.md', '.txt', '.rst', '.adoc'), FileType.DOCUMENTATION),
+}
+NAME_FILE_TYPES: Dict[str, FileType] = dict.fromkeys(
+    ('Dockerfile', 'Makefile', '.env', '.gitignore'), FileType.CONFIG
+)
+
 @dataclass
 class SecurityPattern:
     """Security pattern for vulnerability detection"""
@@ -59,10 +196,15 @@ class SecurityPattern:
     description: str
     file_types: List[str]
     regex: Optional[re.Pattern] = None
+    # Derived once: score deduction per finding and the pattern as reported
+    penalty: float = field(init=False, default=5.0)
+    label: str = field(init=False, default="")
     
     def __post_init__(self):
         if self.pattern and not self.regex:
             self.regex = re.compile(self.pattern, re.IGNORECASE | re.MULTILINE)
+        self.penalty = SEVERITY_PENALTIES.get(self.severity, 5.0)
+        self.label = self.pattern[:50] + "..."
 
 @dataclass
 class GitChange:
@@ -73,7 +215,7 @@ class GitChange:
     new_sha: Optional[str]
     diff_lines: List[Tuple[int, str]]  # line number, content
 
-@dataclass
+@dataclass(**ENTRY_DATACLASS_OPTIONS)
 class CacheEntry:
     """Enhanced cache entry with security metadata"""
     path: str
@@ -91,6 +233,26 @@ class CacheEntry:
     vulnerabilities: List[Dict[str, Any]] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
     partition_key: Optional[str] = None
+    compression: Optional[str] = None  # 'zstd', 'zstd-dict:<dict id>' or 'gzip' when compressed
+
+# security_cache columns in CacheEntry field order, for _cache_entry_from_row
+CACHE_ENTRY_COLUMNS = ('path, checksum, size, modified_time, cached_time, compressed, '
+                       'access_count, last_accessed, content_path, file_type, git_sha, '
+                       'security_score, vulnerabilities, metadata, partition_key')
+
+_FILE_TYPES_BY_VALUE: Dict[str, FileType] = {file_type.value: file_type for file_type in FileType}
+
+def _cache_entry_from_row(cursor: sqlite3.Cursor, row: Tuple) -> CacheEntry:
+    """Row factory for SELECT CACHE_ENTRY_COLUMNS queries"""
+    (path, checksum, size, modified_time, cached_time, compressed, access_count,
+     last_accessed, content_path, file_type, git_sha, security_score,
+     vulnerabilities, metadata, partition_key) = row
+    return CacheEntry(
+        path, checksum, size, modified_time, cached_time, bool(compressed),
+        access_count, last_accessed, content_path, _FILE_TYPES_BY_VALUE[file_type],
+        git_sha, security_score, _json_loads(vulnerabilities or '[]'),
+        _json_loads(metadata or '{}'), partition_key
+    )
 
 @dataclass
 class CachePartition:
@@ -102,13 +264,448 @@ class CachePartition:
     file_count: int
     last_updated: float
 
+def _record_match(pattern_id: int, start: int, end: int, flags: int, hits: Set[int]):
+    """Hyperscan match callback: note which pattern fired"""
+    hits.add(pattern_id)
+
+
+def _sha256_hexdigest(data: Union[bytes, memoryview, mmap.mmap]) -> str:
+    """SHA-256 of any buffer, fed to hashlib one chunk at a time"""
+    view = memoryview(data)
+    digest = hashlib.sha256()
+    for offset in range(0, len(view), HASH_CHUNK_SIZE):
+        digest.update(view[offset:offset + HASH_CHUNK_SIZE])
+    return digest.hexdigest()
+
+
+def _json_dumps(obj: Any) -> Union[bytes, str]:
+    """Serialize a JSON column value; orjson's bytes are stored as-is"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj)
+
+
+def _json_loads(data: Union[bytes, str]) -> Any:
+    """Parse a JSON column value written as text or as bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@lru_cache(maxsize=65536)
+def _partition_for_path(file_path: str, partition_count: int) -> str:
+    """Hash-based partition id of a path"""
+    if xxhash is not None:
+        partition_index = xxhash.xxh3_64_intdigest(file_path.encode()) % partition_count
+    else:
+        path_hash = hashlib.md5(file_path.encode()).hexdigest()
+        partition_index = int(path_hash[:2], 16) % partition_count
+    return f"partition_{partition_index}"
+
+
+# zstd contexts must not be shared between threads
+_zstd_local = local()
+
+
+def _zstd_contexts(dictionary: Optional[Any] = None) -> Tuple[Any, Any]:
+    """This thread's zstd compressor and decompressor for a dictionary, or none"""
+    contexts = getattr(_zstd_local, 'contexts', None)
+    if contexts is None:
+        contexts = _zstd_local.contexts = {}
+    key = dictionary.dict_id() if dictionary is not None else 0
+    pair = contexts.get(key)
+    if pair is None:
+        pair = contexts[key] = (
+            zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dictionary, write_checksum=False),
+            zstandard.ZstdDecompressor(dict_data=dictionary)
+        )
+    return pair
+
+
+def _zstd_dict_id(codec: Optional[str]) -> Optional[int]:
+    """Id of the dictionary a 'zstd-dict:<id>' codec names
+    
+    0 for 'zstd-dict' rows from before ids were recorded, None for codecs
+    that use no dictionary.
+    """
+    if not codec or not codec.startswith('zstd-dict'):
+        return None
+    _, _, dict_id = codec.partition(':')
+    return int(dict_id) if dict_id else 0
+
+
+def _compress(content: bytes, codec: str, dictionary: Optional[Any] = None) -> bytes:
+    """Compress content with the given codec
+    
+    'zstd-dict:<id>' compresses with the given trained dictionary.
+    """
+    if codec.startswith('zstd'):
+        compressor, _ = _zstd_contexts(dictionary if codec != 'zstd' else None)
+        return compressor.compress(content)
+    return gzip.compress(content, compresslevel=6)
+
+
+def _decompress(content: bytes, codec: Optional[str], max_size: Optional[int] = None,
+                size_hint: Optional[int] = None, dictionary: Optional[Any] = None) -> bytes:
+    """Decompress content, stopping after max_size bytes when given
+    
+    With the uncompressed size as size_hint, gzip output is inflated into
+    one buffer of that size instead of a growing one. Rows written before
+    the codec was recorded have no codec and are gzip.
+    """
+    if codec and codec.startswith('zstd'):
+        if codec != 'zstd' and dictionary is None:
+            raise ValueError("content was compressed with a zstd dictionary that is not loaded")
+        _, decompressor = _zstd_contexts(dictionary if codec != 'zstd' else None)
+        if max_size is None:
+            # Frames written with compress() carry their content size
+            return decompressor.decompress(content)
+        with decompressor.stream_reader(content) as reader:
+            return reader.read(max_size)
+    if max_size is None:
+        return zlib.decompress(content, 31, size_hint or zlib.DEF_BUF_SIZE)
+    return zlib.decompressobj(wbits=31).decompress(content, max_size)
+
+
+def _decompress_from(source: Any, codec: Optional[str], max_size: int,
+                     dictionary: Optional[Any] = None) -> bytes:
+    """Decompress the first max_size bytes of a stream read from source
+    
+    source is any object with read(n), such as an SQLite blob; only as much
+    of it is read as the output needs.
+    """
+    if codec and codec.startswith('zstd'):
+        if codec != 'zstd' and dictionary is None:
+            raise ValueError("content was compressed with a zstd dictionary that is not loaded")
+        _, decompressor = _zstd_contexts(dictionary if codec != 'zstd' else None)
+        with decompressor.stream_reader(source, read_size=BLOB_READ_SIZE, closefd=False) as reader:
+            return reader.read(max_size)
+    
+    inflater = zlib.decompressobj(wbits=31)
+    out = bytearray()
+    pending = b''
+    while len(out) < max_size and not inflater.eof:
+        if not pending:
+            pending = source.read(BLOB_READ_SIZE)
+            if not pending:
+                break
+        out += inflater.decompress(pending, max_size - len(out))
+        pending = inflater.unconsumed_tail
+    return bytes(out)
+
+
+def _glob_to_regex(pattern: str) -> re.Pattern:
+    """Translate a glob pattern, where ** spans directories, to a path regex"""
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+            continue
+        c = pattern[i]
+        if c == '*':
+            parts.append('[^/]*')
+        elif c == '?':
+            parts.append('[^/]')
+        elif c == '[' and pattern.find(']', i + 2) != -1:
+            end = pattern.find(']', i + 2)
+            chars = pattern[i + 1:end].replace('\\', '\\\\')
+            if chars.startswith('!'):
+                chars = '^' + chars[1:]
+            parts.append(f'[{chars}]')
+            i = end + 1
+            continue
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return re.compile(''.join(parts) + r'\Z')
+
+
+@lru_cache(maxsize=64)
+def _resolve_roots(directories: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Resolved directories, each ending in a separator for prefix tests"""
+    return tuple(os.path.join(os.path.realpath(directory), '') for directory in directories)
+
+
+# Characters Python's \s matches in str patterns; RE2's \s is ASCII-only
+_PY_WHITESPACE_CLASS = (r'[\t\n\x0b\f\r \x1c-\x1f\x85\xa0\x{1680}\x{2000}-\x{200a}'
+                        r'\x{2028}\x{2029}\x{202f}\x{205f}\x{3000}]')
+# The ASCII part of it, for the byte-level prefilters
+_PY_ASCII_WHITESPACE_CLASS = r'[\t\n\x0b\f\r \x1c-\x1f]'
+_BARE_WHITESPACE_ESCAPE = re.compile(r'(?<!\\)((?:\\\\)*)\\s')
+_NON_ASCII_BYTE = re.compile(rb'[\x80-\xff]')
+
+
+def _re2_pattern(pattern: str, whitespace: str = _PY_WHITESPACE_CLASS) -> str:
+    r"""A pattern RE2 matches like re does with str input; only \s differs
+    for the security patterns, and they never use it inside a character class.
+    """
+    return _BARE_WHITESPACE_ESCAPE.sub(lambda m: m.group(1) + whitespace, pattern)
+
+
+def _prefilter_pattern(pattern: str) -> str:
+    r"""A pattern Hyperscan or an RE2 set matches in ASCII bytes like re does
+    in the decoded text; \s is widened to the separators re also treats
+    as whitespace"""
+    return _re2_pattern(pattern, _PY_ASCII_WHITESPACE_CLASS)
+
+
+def _is_ascii(content: Union[str, bytes, memoryview]) -> bool:
+    """Whether content holds only ASCII; buffers are searched in place"""
+    if isinstance(content, (str, bytes, bytearray)):
+        return content.isascii()
+    return _NON_ASCII_BYTE.search(content) is None
+
+
+def _walk_fast(root: str, extensions: frozenset, max_depth: Optional[int] = None) -> Iterator[os.DirEntry]:
+    """Yield the entries of files below root with an allowed extension
+    
+    Hidden entries and symlinked directories are skipped, so every file
+    yielded that is not itself a symlink lies inside root. With max_depth,
+    only files at most that many directory levels deep are yielded.
+    """
+    stack = [(root, 0)]
+    while stack:
+        directory, depth = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if max_depth is None or depth + 1 < max_depth:
+                                stack.append((entry.path, depth + 1))
+                        elif os.path.splitext(entry.name)[1].lower() in extensions and entry.is_file():
+                            yield entry
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def _count_newlines(data: Union[bytes, memoryview, mmap.mmap]) -> int:
+    """Count newline bytes with a vectorized compare, without decoding"""
+    return int(np.count_nonzero(np.frombuffer(data, dtype=np.uint8) == 0x0A))
+
+
+def _git_blob_sha1(data: Union[bytes, memoryview, mmap.mmap]) -> str:
+    """Object id git assigns to a blob with this content"""
+    view = memoryview(data)
+    digest = hashlib.sha1(b"blob %d\0" % len(view))
+    for offset in range(0, len(view), HASH_CHUNK_SIZE):
+        digest.update(view[offset:offset + HASH_CHUNK_SIZE])
+    return digest.hexdigest()
+
+
+def _pooled_map(executor: ThreadPoolExecutor, fn: Callable, items: Iterable,
+                max_in_flight: int) -> Iterator[Tuple[Any, Future]]:
+    """Run fn over items on a long-lived executor, at most max_in_flight at once
+    
+    Items are consumed lazily; (item, future) pairs are yielded as they
+    complete. Finished futures report themselves on a queue, so the caller
+    never waits on the whole set of pending tasks.
+    """
+    items = iter(items)
+    completed: queue.Queue = queue.Queue()
+    in_flight = 0
+    exhausted = False
+    
+    while True:
+        while not exhausted and in_flight < max_in_flight:
+            item = next(items, _pooled_map)
+            if item is _pooled_map:
+                exhausted = True
+            else:
+                future = executor.submit(fn, item)
+                future.add_done_callback(lambda future, item=item: completed.put((item, future)))
+                in_flight += 1
+        if not in_flight:
+            return
+        
+        yield completed.get()
+        in_flight -= 1
+
+
+def _check_sha_acceleration():
+    """Warn when checksums will run without hardware SHA-256 support"""
+    import ssl
+    if ssl.OPENSSL_VERSION_INFO < (1, 1, 1):
+        logger.warning(f"{ssl.OPENSSL_VERSION} predates SHA-NI support; checksums will be slow")
+        return
+    try:
+        with open('/proc/cpuinfo') as f:
+            flags = next((line for line in f if line.startswith('flags')), '')
+    except OSError:
+        return  # Not Linux; nothing to check
+    if flags and ' sha_ni' not in flags:
+        logger.warning("CPU lacks SHA extensions; checksums use software SHA-256")
+
+
+class _ReaderSlot:
+    """Holds a thread's reader; the connection closes when the slot is freed"""
+    __slots__ = ('conn', '__weakref__')
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+class SQLitePool:
+    """Connections to one SQLite database: a persistent reader per thread
+    and a single writer. WAL mode lets the readers proceed while a write is
+    in progress; writes are serialized on the writer's lock."""
+    
+    def __init__(self, db_file: Path):
+        self.db_file = db_file
+        self.write_conn = self._connect()
+        self.write_lock = RLock()
+        self._local = local()
+        # Closers of live readers; a reader also closes when its thread exits
+        self._closers: List[weakref.finalize] = []
+        self._open_lock = Lock()
+    
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a connection with the cache's standard settings"""
+        conn = sqlite3.connect(str(self.db_file), check_same_thread=False,
+                               cached_statements=SQLITE_CACHED_STATEMENTS)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=10000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA wal_autocheckpoint={WAL_AUTOCHECKPOINT}")
+        conn.execute("PRAGMA mmap_size=1073741824")
+        # INSERT OR REPLACE only fires delete triggers for the rows it
+        # replaces with this on, which the partition totals rely on
+        conn.execute("PRAGMA recursive_triggers=ON")
+        if read_only:
+            # Readers can never take the write lock away from the writer
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+    
+    def reader(self) -> sqlite3.Connection:
+        """The calling thread's reader, opened on first use"""
+        slot = getattr(self._local, 'slot', None)
+        if slot is None:
+            conn = self._connect(read_only=True)
+            slot = self._local.slot = _ReaderSlot(conn)
+            with self._open_lock:
+                self._closers = [closer for closer in self._closers if closer.alive]
+                self._closers.append(weakref.finalize(slot, conn.close))
+        return slot.conn
+    
+    def close(self):
+        """Close the writer and every reader"""
+        self.write_conn.close()
+        with self._open_lock:
+            closers, self._closers = self._closers, []
+        for closer in closers:
+            closer()
+
+
+class EntryCache:
+    """Bounded in-memory map of path to CacheEntry with TTL expiry and
+    value-aware LRU eviction
+    
+    When full, the least recently used entries are sampled and the one with
+    the lowest value log(uses / age + hit share + 1e-6) is evicted, where
+    uses counts the entry's recorded accesses plus its hits here, age is the
+    time since it was cached and hit share is its fraction of all hits. An
+    entry touched once by a sweep thus goes before one hit repeatedly. Not
+    thread-safe; callers hold their own lock.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # path -> [entry, expires_at, cached_at, hits], least recent first
+        self._slots: "OrderedDict[str, list]" = OrderedDict()
+        self._hits = 0
+    
+    def __len__(self) -> int:
+        return len(self._slots)
+    
+    def get(self, path: str, default: Optional[CacheEntry] = None) -> Optional[CacheEntry]:
+        slot = self._slots.get(path)
+        if slot is None:
+            return default
+        now = time.monotonic()
+        if slot[1] <= now:
+            del self._slots[path]
+            return default
+        self._slots.move_to_end(path)
+        slot[3] += 1
+        self._hits += 1
+        return slot[0]
+    
+    def __setitem__(self, path: str, entry: CacheEntry):
+        now = time.monotonic()
+        slot = self._slots.get(path)
+        if slot is not None:
+            slot[0] = entry
+            slot[1] = now + self.ttl
+            slot[2] = now
+            self._slots.move_to_end(path)
+            return
+        if len(self._slots) >= self.maxsize:
+            self._evict(now)
+        self._slots[path] = [entry, now + self.ttl, now, 0]
+    
+    def pop(self, path: str, default: Optional[CacheEntry] = None) -> Optional[CacheEntry]:
+        slot = self._slots.pop(path, None)
+        return default if slot is None else slot[0]
+    
+    def clear(self):
+        self._slots.clear()
+        self._hits = 0
+    
+    def _evict(self, now: float):
+        """Drop one entry: an expired one if sampled, else the least valuable"""
+        sample = max(1, min(EVICTION_SAMPLE_MAX, int(len(self._slots) * EVICTION_SAMPLE_FRACTION)))
+        victim, lowest = None, math.inf
+        for path, (entry, expires_at, cached_at, hits) in itertools.islice(self._slots.items(), sample):
+            if expires_at <= now:
+                victim = path
+                break
+            age = max(now - cached_at, 1e-3)
+            value = math.log((entry.access_count + hits) / age + hits / (self._hits or 1) + 1e-6)
+            if value < lowest:
+                victim, lowest = path, value
+        del self._slots[victim]
+
+
 class SecurityAnalyzer:
     """Fast security pattern analyzer"""
     
     def __init__(self):
         self.patterns = self._load_security_patterns()
         self._compiled_patterns = {}
+        # Patterns grouped by the file extensions they apply to
+        self._patterns_by_ext: Dict[str, List[SecurityPattern]] = {}
         self._init_patterns()
+        
+        # One Hyperscan database per file extension; scratch space cannot be
+        # shared between concurrent scans, so each thread keeps its own
+        self._hs_databases: Optional[Dict[str, Any]] = None
+        self._hs_local = local()
+        if hyperscan is not None:
+            self._init_hyperscan()
+        
+        # Otherwise one RE2 set per file extension serves as the prefilter
+        self._re2_sets: Optional[Dict[str, Tuple[Any, List[int]]]] = None
+        if self._hs_databases is None and re2 is not None:
+            self._init_re2()
+        
+        # Matches of candidate patterns are counted with RE2 when available,
+        # which runs in linear time where re can backtrack
+        self._re2_patterns: Dict[str, Any] = {}
+        if re2 is not None:
+            self._init_re2_patterns()
     
     def _load_security_patterns(self) -> List[SecurityPattern]:
         """Load security patterns for vulnerability detection"""
@@ -190,39 +787,136 @@ class SecurityAnalyzer:
         for pattern in self.patterns:
             if pattern.regex:
                 self._compiled_patterns[pattern.pattern] = pattern.regex
+                for ext in pattern.file_types:
+                    self._patterns_by_ext.setdefault(ext, []).append(pattern)
     
-    def analyze_content(self, content: str, file_path: str) -> Tuple[float, List[Dict[str, Any]]]:
-        """Analyze content for security vulnerabilities"""
+    def _init_hyperscan(self):
+        """Compile the patterns of each file extension into one database"""
+        flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_MULTILINE | hyperscan.HS_FLAG_SINGLEMATCH
+        index = {id(pattern): i for i, pattern in enumerate(self.patterns)}
+        databases = {}
+        try:
+            for ext, patterns in self._patterns_by_ext.items():
+                ids = [index[id(pattern)] for pattern in patterns]
+                expressions = [_prefilter_pattern(self.patterns[i].pattern).encode('utf-8') for i in ids]
+                db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+                try:
+                    db.compile(expressions=expressions, ids=ids, flags=flags)
+                except hyperscan.error:
+                    # Hits are confirmed with re anyway, so constructs
+                    # Hyperscan cannot match exactly may be approximated
+                    db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+                    db.compile(expressions=expressions, ids=ids,
+                               flags=flags | hyperscan.HS_FLAG_PREFILTER)
+                databases[ext] = db
+        except hyperscan.error as e:
+            logger.warning(f"Hyperscan unavailable for security patterns: {e}")
+            return
+        self._hs_databases = databases
+    
+    def _init_re2(self):
+        """Compile the patterns of each file extension into one RE2 set"""
+        options = re2.Options()
+        options.case_sensitive = False
+        # Match raw bytes; all patterns are ASCII
+        options.encoding = re2.Options.Encoding.LATIN1
+        index = {id(pattern): i for i, pattern in enumerate(self.patterns)}
+        sets = {}
+        try:
+            for ext, patterns in self._patterns_by_ext.items():
+                pattern_set = re2.Set.SearchSet(options)
+                for pattern in patterns:
+                    pattern_set.Add(_prefilter_pattern(pattern.pattern))
+                pattern_set.Compile()
+                sets[ext] = (pattern_set, [index[id(pattern)] for pattern in patterns])
+        except re2.error as e:
+            logger.warning(f"RE2 unavailable for security patterns, using re: {e}")
+            return
+        self._re2_sets = sets
+    
+    def _init_re2_patterns(self):
+        """Compile each pattern for RE2, leaving those it rejects to re"""
+        options = re2.Options()
+        options.case_sensitive = False
+        for pattern in self.patterns:
+            try:
+                self._re2_patterns[pattern.pattern] = re2.compile(_re2_pattern(pattern.pattern), options)
+            except re2.error:
+                continue
+    
+    def _count_matches(self, pattern: SecurityPattern, content: str) -> int:
+        """Number of non-overlapping matches of pattern, as re.findall finds them"""
+        regex = self._re2_patterns.get(pattern.pattern)
+        if regex is None:
+            return len(pattern.regex.findall(content))
+        return sum(1 for _ in regex.finditer(content))
+    
+    def _candidate_patterns(self, content: Union[str, bytes, memoryview], file_ext: str) -> List[SecurityPattern]:
+        """Patterns that match somewhere in content, found in one Hyperscan pass"""
+        db = self._hs_databases.get(file_ext)
+        if db is None:
+            return []
+        
+        scratches = getattr(self._hs_local, 'scratches', None)
+        if scratches is None:
+            scratches = self._hs_local.scratches = {}
+        scratch = scratches.get(file_ext)
+        if scratch is None:
+            scratch = scratches[file_ext] = hyperscan.Scratch(db)
+        
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        hits: Set[int] = set()
+        db.scan(content, match_event_handler=_record_match, context=hits, scratch=scratch)
+        return [self.patterns[i] for i in sorted(hits)]
+    
+    def _re2_candidate_patterns(self, content: Union[str, bytes, memoryview], file_ext: str) -> List[SecurityPattern]:
+        """Patterns that match somewhere in content, found in one RE2 set pass"""
+        pattern_set, ids = self._re2_sets[file_ext]
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        # Match() returns None rather than an empty list when nothing matches
+        return [self.patterns[ids[i]] for i in sorted(pattern_set.Match(content) or ())]
+    
+    def analyze_content(self, content: Union[str, bytes, memoryview], file_path: str,
+                        file_ext: Optional[str] = None) -> Tuple[float, List[Dict[str, Any]]]:
+        """Analyze content for security vulnerabilities
+        
+        Raw bytes or any buffer are accepted and only decoded when a pattern
+        needs its matches counted.
+        """
         vulnerabilities = []
         security_score = 100.0
         
-        file_ext = Path(file_path).suffix.lower()
+        if file_ext is None:
+            file_ext = Path(file_path).suffix.lower()
         
-        for pattern in self.patterns:
-            if file_ext not in pattern.file_types:
-                continue
-            
-            if pattern.regex:
-                matches = pattern.regex.findall(content)
-                if matches:
-                    vuln = {
-                        "type": pattern.description,
-                        "severity": pattern.severity,
-                        "pattern": pattern.pattern[:50] + "...",
-                        "matches": len(matches),
-                        "file": file_path
-                    }
-                    vulnerabilities.append(vuln)
-                    
-                    # Adjust security score based on severity
-                    if pattern.severity == "CRITICAL":
-                        security_score -= 30
-                    elif pattern.severity == "HIGH":
-                        security_score -= 20
-                    elif pattern.severity == "MEDIUM":
-                        security_score -= 10
-                    else:
-                        security_score -= 5
+        patterns = self._patterns_by_ext.get(file_ext)
+        if not patterns:
+            return security_score, vulnerabilities
+        # The prefilters scan bytes, which are the text counted below only
+        # for ASCII content: decoding drops invalid bytes, which may split a
+        # keyword, and re's \s and IGNORECASE cover Unicode. Other content
+        # is counted with every pattern
+        if _is_ascii(content):
+            if self._hs_databases is not None:
+                patterns = self._candidate_patterns(content, file_ext)
+            elif self._re2_sets is not None:
+                patterns = self._re2_candidate_patterns(content, file_ext)
+        
+        for pattern in patterns:
+            if not isinstance(content, str):
+                content = str(content, 'utf-8', errors='ignore')
+            matches = self._count_matches(pattern, content)
+            if matches:
+                vulnerabilities.append({
+                    "type": pattern.description,
+                    "severity": pattern.severity,
+                    "pattern": pattern.label,
+                    "matches": matches,
+                    "file": file_path
+                })
+                security_score -= pattern.penalty
         
         return max(0, security_score), vulnerabilities
 
@@ -304,6 +998,7 @@ class ClaudeCacheSecurityEnhanced:
         self.cache_dir = Path(cache_dir or os.path.expanduser("~/.claude/cache"))
         self.config_file = self.cache_dir / "config" / "security_cache.json"
         self.db_file = self.cache_dir / "files" / "security_index.db"
+        self.zstd_dict_file = self.cache_dir / "files" / "zstd.dict"
         
         # Security: Define allowed directories
         self.allowed_dirs = allowed_dirs or [
@@ -312,31 +1007,65 @@ class ClaudeCacheSecurityEnhanced:
         ]
         
         # Thread safety
-        self._db_lock = Lock()
         self._stats_lock = Lock()
         self._partition_lock = Lock()
         
+        # CPUs the process may run on. A new thread inherits the affinity of
+        # the thread that starts it, and the daemon pins its handler threads
+        # (which start these pools' threads) to single CPUs, so pool threads
+        # are reset to this set
+        self._allowed_cpus = os.sched_getaffinity(0) if hasattr(os, 'sched_getaffinity') else None
+        
         # Performance executors
-        self._io_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="io")
-        self._cpu_executor = ProcessPoolExecutor(max_workers=4)
+        self._io_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="io",
+                                               initializer=self._init_pool_thread)
+        # Warm-up and scan workers by pool size; their threads, and the
+        # database readers each opens, outlive a single run
+        self._worker_pools: Dict[int, ThreadPoolExecutor] = {}
+        self._worker_pools_lock = Lock()
         
         # Initialize components
         self.security_analyzer = SecurityAnalyzer()
+        _check_sha_acceleration()
         self.git_integration = None
         
+        # Load configuration
+        self.config = self._load_config()
+        
+        # Once trained, the dictionary file is never replaced: content
+        # compressed with it needs the same dictionary to be read back, and
+        # other processes on this cache directory adopt it instead of
+        # training their own
+        self._zstd_dict = None
+        self._zstd_dict_lock = Lock()
+        if zstandard is not None:
+            self._load_zstd_dict()
+        
         # Cache partitions for large codebases
         self.partitions: Dict[str, CachePartition] = {}
         self._init_partitions()
+        self._n_partitions = len(self.partitions)
         
         # Multi-level caching
-        self._memory_cache = LRUCache(maxsize=1000)  # Hot cache
-        self._ttl_cache = TTLCache(maxsize=5000, ttl=3600)  # Warm cache
+        # Entries cached in memory, evicted by age, recency and use
+        self._cache = EntryCache(
+            maxsize=self.config.get("ttl_cache_size", 5000),
+            ttl=self.config.get("ttl_seconds", 3600)
+        )
+        self._cache_lock = RLock()
         
-        # Connection pools
-        self._db_pools: Dict[str, sqlite3.Connection] = {}
+        # Connection pools, one per database file
+        self._db_pools: Dict[str, SQLitePool] = {}
+        self._pools_lock = Lock()
         
-        # Load configuration
-        self.config = self._load_config()
+        # Warm-ups in progress; checkpoints are deferred while any runs
+        self._bulk_loads = 0
+        self._bulk_loads_lock = Lock()
+        
+        # Connections with the partitions attached, each paired with the
+        # UNION ALL query that reads their totals; opened on first use
+        self._stats_readers: Optional[List[Tuple[sqlite3.Connection, str]]] = None
+        self._stats_readers_lock = Lock()
         
         # Initialize database
         self._init_database()
@@ -344,6 +1073,17 @@ class ClaudeCacheSecurityEnhanced:
         # Statistics
         self.stats = defaultdict(int)
         
+        # Access counts of cache hits, (hits, last access) per path, held
+        # until the writer thread commits them with its next batch
+        self._pending_access: Dict[str, List[Any]] = {}
+        self._access_lock = Lock()
+        
+        # All cache writes are funneled through one writer thread that
+        # commits them in batches
+        self._write_queue: queue.Queue = queue.Queue(maxsize=2 * WRITE_BATCH_SIZE)
+        self._writer_thread = Thread(target=self._write_worker, name="cache-writer", daemon=True)
+        self._writer_thread.start()
+        
         # Background workers
         self._start_background_workers()
         
@@ -356,9 +1096,11 @@ class ClaudeCacheSecurityEnhanced:
             "partition_size_mb": 500,
             "max_file_size_mb": 50,
             "compression_threshold_kb": 100,
+            "compression_codec": "zstd",  # zstd, gzip
+            "compression_dictionary": True,  # train a zstd dictionary after warm-up
             "security_analysis": True,
             "git_integration": True,
-            "parallel_workers": 8,
+            "parallel_workers": DEFAULT_WARM_WORKERS,
             "memory_cache_size": 1000,
             "ttl_cache_size": 5000,
             "ttl_seconds": 3600,
@@ -404,15 +1146,12 @@ class ClaudeCacheSecurityEnhanced:
     
     def _get_partition_for_path(self, file_path: str) -> str:
         """Determine which partition a file should go to"""
-        # Simple hash-based partitioning
-        path_hash = hashlib.md5(file_path.encode()).hexdigest()
-        partition_index = int(path_hash[:2], 16) % len(self.partitions)
-        return f"partition_{partition_index}"
+        return _partition_for_path(file_path, self._n_partitions)
     
     def _init_database(self):
         """Initialize enhanced database schema"""
         # Main index database
-        with self._get_db_connection() as conn:
+        with self._get_db_connection(write=True) as conn:
             conn.execute('''
                 CREATE TABLE IF NOT EXISTS security_cache (
                     path TEXT PRIMARY KEY,
@@ -436,6 +1175,8 @@ class ClaudeCacheSecurityEnhanced:
             
             # Create indexes for performance
             conn.execute('CREATE INDEX IF NOT EXISTS idx_path ON security_cache(path)')
+            # Covers content lookups, which need only the partition
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_path_partition ON security_cache(path, partition_key)')
             conn.execute('CREATE INDEX IF NOT EXISTS idx_git_sha ON security_cache(git_sha)')
             conn.execute('CREATE INDEX IF NOT EXISTS idx_security_score ON security_cache(security_score)')
             conn.execute('CREATE INDEX IF NOT EXISTS idx_partition ON security_cache(partition_key)')
@@ -464,6 +1205,9 @@ class ClaudeCacheSecurityEnhanced:
                     FOREIGN KEY (file_path) REFERENCES security_cache(path)
                 )
             ''')
+            # Covers the security report's open-vulnerability breakdown
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_vuln_resolved_sev '
+                         'ON vulnerabilities(resolved, severity, vulnerability_type)')
             
             # Performance metrics table
             conn.execute('''
@@ -486,83 +1230,120 @@ class ClaudeCacheSecurityEnhanced:
     def _init_partition_db(self, partition: CachePartition):
         """Initialize partition-specific database"""
         with sqlite3.connect(str(partition.db_file)) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS partition_cache (
-                    path TEXT PRIMARY KEY,
-                    content BLOB,
-                    compressed BOOLEAN,
-                    size INTEGER,
-                    checksum TEXT,
-                    FOREIGN KEY (path) REFERENCES security_cache(path)
-                )
-            ''')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_path ON partition_cache(path)')
-            conn.commit()
-    
-    @contextmanager
-    def _get_db_connection(self, partition_id: str = None) -> sqlite3.Connection:
-        """Get database connection with pooling"""
-        db_file = self.partitions[partition_id].db_file if partition_id else self.db_file
-        
-        with self._db_lock:
-            if str(db_file) not in self._db_pools:
-                conn = sqlite3.connect(str(db_file), check_same_thread=False)
-                conn.row_factory = sqlite3.Row
-                conn.execute("PRAGMA journal_mode=WAL")
-                conn.execute("PRAGMA synchronous=NORMAL")
-                conn.execute("PRAGMA cache_size=10000")
-                conn.execute("PRAGMA temp_store=MEMORY")
-                self._db_pools[str(db_file)] = conn
+            conn.executescript(PARTITION_CACHE_SCHEMA)
             
-            yield self._db_pools[str(db_file)]
+            # Databases from before the codec column hold gzip content only
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(partition_cache)')}
+            if 'compression' not in columns:
+                conn.execute('ALTER TABLE partition_cache ADD COLUMN compression TEXT')
     
-    def _start_background_workers(self):
-        """Start background workers for async operations"""
-        # Incremental update worker
-        self._update_thread = Thread(target=self._incremental_update_worker, daemon=True)
-        self._update_thread.start()
-        
-        # Vulnerability scan worker
-        self._scan_thread = Thread(target=self._vulnerability_scan_worker, daemon=True)
-        self._scan_thread.start()
+    def _get_db_pool(self, partition_id: str = None) -> SQLitePool:
+        """Get the connection pool of the main or a partition database"""
+        db_file = str(self.partitions[partition_id].db_file if partition_id else self.db_file)
         
-        # Partition rebalance worker
-        self._rebalance_thread = Thread(target=self._partition_rebalance_worker, daemon=True)
-        self._rebalance_thread.start()
+        pool = self._db_pools.get(db_file)
+        if pool is None:
+            with self._pools_lock:
+                pool = self._db_pools.get(db_file)
+                if pool is None:
+                    pool = SQLitePool(Path(db_file))
+                    self._db_pools[db_file] = pool
+        return pool
     
-    def _incremental_update_worker(self):
-        """Background worker for incremental git updates"""
-        interval = self.config.get("incremental_update_interval", 300)
+    @contextmanager
+    def _get_db_connection(self, partition_id: str = None, write: bool = False) -> sqlite3.Connection:
+        """Get a pooled database connection
         
-        while True:
-            try:
-                time.sleep(interval)
-                if self.git_integration:
-                    self.update_from_git()
-            except Exception as e:
-                logger.error(f"Incremental update error: {e}")
+        Each thread reads through its own long-lived connection, so readers
+        run concurrently; with write=True the database's single write
+        connection is held exclusively.
+        """
+        pool = self._get_db_pool(partition_id)
+        
+        if write:
+            with pool.write_lock:
+                conn = pool.write_conn
+                try:
+                    yield conn
+                except BaseException:
+                    # Don't leave a half-done transaction for the next writer
+                    if conn.in_transaction:
+                        conn.rollback()
+                    raise
+        else:
+            yield pool.reader()
     
-    def _vulnerability_scan_worker(self):
-        """Background worker for periodic vulnerability scanning"""
-        interval = self.config.get("vulnerability_scan_interval", 3600)
+    def _open_stats_readers(self) -> List[Tuple[sqlite3.Connection, str]]:
+        """Attach the partitions to in-memory connections for aggregate queries
         
-        while True:
-            try:
-                time.sleep(interval)
-                self.scan_all_vulnerabilities()
-            except Exception as e:
-                logger.error(f"Vulnerability scan error: {e}")
+        Each connection takes as many partitions as SQLite allows to be
+        attached, so a single query reads the totals of all of them.
+        """
+        readers = []
+        partition_ids = list(self.partitions)
+        for start in range(0, len(partition_ids), SQLITE_MAX_ATTACHED):
+            conn = sqlite3.connect(':memory:', check_same_thread=False,
+                                   cached_statements=SQLITE_CACHED_STATEMENTS)
+            selects = []
+            for i, partition_id in enumerate(partition_ids[start:start + SQLITE_MAX_ATTACHED], start):
+                conn.execute(f'ATTACH DATABASE ? AS p{i}', (str(self.partitions[partition_id].db_file),))
+                selects.append(f"SELECT '{partition_id}', file_count, total_size FROM p{i}.partition_stats")
+            conn.execute("PRAGMA query_only=ON")
+            readers.append((conn, ' UNION ALL '.join(selects)))
+        return readers
+    
+    def _partition_stats(self) -> Dict[str, Tuple[int, int]]:
+        """File count and total content size of each partition"""
+        with self._stats_readers_lock:
+            if self._stats_readers is None:
+                self._stats_readers = self._open_stats_readers()
+            stats = {}
+            for conn, query in self._stats_readers:
+                for partition_id, file_count, total_size in conn.execute(query):
+                    stats[partition_id] = (file_count, total_size)
+        return stats
     
-    def _partition_rebalance_worker(self):
-        """Background worker for partition rebalancing"""
-        interval = 3600  # 1 hour
+    def _start_background_workers(self):
+        """Start the periodic maintenance jobs on one scheduler thread
         
-        while True:
+        Jobs run one at a time, so a vulnerability scan never overlaps a
+        partition rebalance or a git update.
+        """
+        self._scheduler = sched.scheduler(time.monotonic, time.sleep)
+        
+        # Incremental git updates
+        self._schedule_periodic(
+            self.config.get("incremental_update_interval", 300), 1,
+            self._incremental_update, "Incremental update"
+        )
+        
+        # Vulnerability scans
+        self._schedule_periodic(
+            self.config.get("vulnerability_scan_interval", 3600), 2,
+            self.scan_all_vulnerabilities, "Vulnerability scan"
+        )
+        
+        # Partition rebalancing, hourly
+        self._schedule_periodic(3600, 3, self._rebalance_partitions, "Partition rebalance")
+        
+        self._scheduler_thread = Thread(target=self._scheduler.run, name="cache-scheduler", daemon=True)
+        self._scheduler_thread.start()
+    
+    def _schedule_periodic(self, interval: float, priority: int, job, name: str):
+        """Run job every interval seconds, counted from the end of the last run"""
+        def run():
             try:
-                time.sleep(interval)
-                self._rebalance_partitions()
+                job()
             except Exception as e:
-                logger.error(f"Partition rebalance error: {e}")
+                logger.error(f"{name} error: {e}")
+            self._scheduler.enter(interval, priority, run)
+        
+        self._scheduler.enter(interval, priority, run)
+    
+    def _incremental_update(self):
+        """Apply git changes to the cache when git integration is enabled"""
+        if self.git_integration:
+            self.update_from_git()
     
     def set_git_repo(self, repo_path: str):
         """Set git repository for incremental updates"""
@@ -571,63 +1352,95 @@ class ClaudeCacheSecurityEnhanced:
     
     def cache_file_enhanced(self, file_path: str, force: bool = False) -> Optional[CacheEntry]:
         """Enhanced file caching with security analysis"""
+        prepared = self._prepare_file(file_path, force)
+        if prepared is None:
+            return None
+        
+        entry, content = prepared
+        if content is not None:
+            try:
+                self._queue_write(prepared).result()
+            except Exception as e:
+                logger.error(f"Error caching file {file_path}: {e}")
+                return None
+        
+        return entry
+    
+    def _prepare_file(self, file_path: str, force: bool = False) -> Optional[Tuple[CacheEntry, Optional[bytes]]]:
+        """Read, analyze, hash and compress a file for caching
+        
+        Nothing is written to the cache, so workers can run this side by
+        side. Returns (entry, stored content) for _store_entries, or
+        (entry, None) when the cached copy is already current.
+        """
         if not self._validate_path(file_path):
             return None
         
         try:
             path = Path(file_path).resolve()
+            # One stat per file; taken before the read, so a concurrent
+            # change leaves the entry looking stale rather than current
+            stat_result = path.stat()
             
             # Check if already cached and up-to-date
             if not force:
                 cached_entry = self._get_cache_entry(str(path))
-                if cached_entry and cached_entry.modified_time >= path.stat().st_mtime:
+                if cached_entry and cached_entry.modified_time >= stat_result.st_mtime:
                     self._update_access_stats(str(path))
-                    return cached_entry
+                    return cached_entry, None
             
             # Determine file type
-            file_type = self._determine_file_type(path)
-            
-            # Read file content
-            content = self._read_file_efficiently(path)
-            if content is None:
-                return None
-            
-            # Security analysis
-            security_score = 100.0
-            vulnerabilities = []
-            
-            if self.config.get("security_analysis", True) and file_type == FileType.SOURCE_CODE:
-                security_score, vulnerabilities = self.security_analyzer.analyze_content(
-                    content.decode('utf-8', errors='ignore'), 
-                    str(path)
-                )
+            ext = path.suffix.lower()
+            file_type = self._determine_file_type(path, ext)
             
-            # Calculate checksum
-            checksum = hashlib.sha256(content).hexdigest()
+            # Read file content; large files are mapped, not copied, until
+            # they are compressed
+            with self._read_file_efficiently(path, stat_result.st_size) as content:
+                if content is None:
+                    return None
+                
+                # Security analysis
+                security_score = 100.0
+                vulnerabilities = []
+                
+                if self.config.get("security_analysis", True) and file_type == FileType.SOURCE_CODE:
+                    security_score, vulnerabilities = self.security_analyzer.analyze_content(
+                        content, str(path), ext
+                    )
+                
+                # Calculate checksum
+                checksum = _sha256_hexdigest(content)
+                
+                # Git blob SHA, as `git hash-object` would report it
+                git_sha = _git_blob_sha1(content) if self.git_integration else None
+                
+                lines = _count_newlines(content)
+                
+                # Compress if needed
+                compressed = False
+                compression = None
+                if len(content) > self.config.get("compression_threshold_kb", 100) * 1024:
+                    compression = self.config.get("compression_codec", "zstd")
+                    if compression == 'zstd' and zstandard is None:
+                        compression = 'gzip'
+                    dictionary = self._zstd_dict
+                    if compression == 'zstd' and dictionary is not None:
+                        compression = f'zstd-dict:{dictionary.dict_id()}'
+                    content = _compress(content, compression, dictionary)
+                    compressed = True
+                elif not isinstance(content, bytes):
+                    # The mapping is closed on exit
+                    content = bytes(content)
             
             # Determine partition
             partition_id = self._get_partition_for_path(str(path))
             
-            # Compress if needed
-            compressed = False
-            if len(content) > self.config.get("compression_threshold_kb", 100) * 1024:
-                content = gzip.compress(content, compresslevel=6)
-                compressed = True
-            
-            # Get git SHA if available
-            git_sha = None
-            if self.git_integration:
-                try:
-                    git_sha = self.git_integration.repo.git.hash_object(str(path))
-                except:
-                    pass
-            
             # Create cache entry
             entry = CacheEntry(
                 path=str(path),
                 checksum=checksum,
-                size=path.stat().st_size,
-                modified_time=path.stat().st_mtime,
+                size=stat_result.st_size,
+                modified_time=stat_result.st_mtime,
                 cached_time=time.time(),
                 compressed=compressed,
                 access_count=1,
@@ -638,120 +1451,232 @@ class ClaudeCacheSecurityEnhanced:
                 security_score=security_score,
                 vulnerabilities=vulnerabilities,
                 partition_key=partition_id,
+                compression=compression,
                 metadata={
                     "mime_type": mimetypes.guess_type(str(path))[0],
                     "encoding": "utf-8",
-                    "lines": content.decode('utf-8', errors='ignore').count('\n') if not compressed else -1
+                    "lines": lines
                 }
             )
             
-            # Store in partition
-            self._store_in_partition(entry, content, partition_id)
-            
-            # Update main index
-            self._update_index(entry)
-            
-            # Update caches
-            with self._db_lock:
-                self._memory_cache[str(path)] = entry
-                self._ttl_cache[str(path)] = entry
-            
-            # Store vulnerabilities
-            if vulnerabilities:
-                self._store_vulnerabilities(str(path), vulnerabilities)
-            
-            self.stats['cached_files'] += 1
-            
-            return entry
+            return entry, content
             
         except Exception as e:
             logger.error(f"Error caching file {file_path}: {e}")
             self.stats['errors'] += 1
             return None
     
-    def _determine_file_type(self, path: Path) -> FileType:
+    def _determine_file_type(self, path: Path, ext: Optional[str] = None) -> FileType:
         """Determine file type for optimized handling"""
-        ext = path.suffix.lower()
-        
-        source_extensions = {'.py', '.js', '.ts', '.java', '.cs', '.go', '.php', '.rb', '.c', '.cpp', '.rs'}
-        config_extensions = {'.yml', '.yaml', '.json', '.xml', '.conf', '.ini', '.toml'}
-        doc_extensions = {'.md', '.txt', '.rst', '.adoc'}
-        
-        if ext in source_extensions:
-            return FileType.SOURCE_CODE
-        elif ext in config_extensions:
-            return FileType.CONFIG
-        elif ext in doc_extensions:
-            return FileType.DOCUMENTATION
-        elif path.name in {'Dockerfile', 'Makefile', '.env', '.gitignore'}:
-            return FileType.CONFIG
-        else:
-            return FileType.DATA
+        if ext is None:
+            ext = path.suffix.lower()
+        return EXTENSION_FILE_TYPES.get(ext) or NAME_FILE_TYPES.get(path.name, FileType.DATA)
     
-    def _read_file_efficiently(self, path: Path) -> Optional[bytes]:
-        """Read file efficiently based on size"""
+    @contextmanager
+    def _read_file_efficiently(self, path: Path, file_size: Optional[int] = None) -> Iterator[Optional[Union[memoryview, bytes]]]:
+        """Read file efficiently based on size
+        
+        Large files are yielded as a view of a read-only mapping, which is
+        only valid inside the with block. Small files are read with a single
+        unbuffered read of file_size bytes, when the caller already knows it.
+        """
+        mapped = None
         try:
-            file_size = path.stat().st_size
+            if file_size is None:
+                file_size = path.stat().st_size
             max_size = self.config.get("max_file_size_mb", 50) * 1024 * 1024
             
             if file_size > max_size:
                 logger.warning(f"File too large: {path} ({file_size} bytes)")
-                return None
-            
+                content = None
             # Use memory mapping for large files
-            if file_size > 1024 * 1024:  # 1MB
+            elif file_size > 1024 * 1024:  # 1MB
                 with open(path, 'rb') as f:
-                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mmapped:
-                        return bytes(mmapped)
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                content = memoryview(mapped)
             else:
-                return path.read_bytes()
+                fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0) | getattr(os, 'O_CLOEXEC', 0))
+                try:
+                    content = os.read(fd, file_size)
+                finally:
+                    os.close(fd)
                 
         except Exception as e:
             logger.error(f"Error reading file {path}: {e}")
-            return None
+            content = None
+        
+        try:
+            yield content
+        finally:
+            if mapped is not None:
+                content.release()
+                mapped.close()
+    
+    def _queue_write(self, prepared: Optional[Tuple[CacheEntry, bytes]], urgent: bool = True) -> Future:
+        """Hand a prepared entry to the writer thread
+        
+        The returned future completes once the entry is committed. Urgent
+        items are written as soon as the writer gets to them; others may
+        wait up to WRITE_FLUSH_INTERVAL for more entries to share their
+        transaction. Queueing None just flushes what is pending.
+        """
+        future = Future()
+        self._write_queue.put((prepared, future, urgent))
+        return future
     
-    def _store_in_partition(self, entry: CacheEntry, content: bytes, partition_id: str):
+    def _write_worker(self):
+        """Writer thread: group queued entries into batched transactions"""
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                return
+            
+            batch = [item]
+            urgent = item[2]
+            deadline = time.monotonic() + WRITE_FLUSH_INTERVAL
+            stopping = False
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    if urgent:
+                        item = self._write_queue.get_nowait()
+                    else:
+                        timeout = deadline - time.monotonic()
+                        if timeout <= 0:
+                            break
+                        item = self._write_queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                urgent = urgent or item[2]
+            
+            self._write_batch(batch)
+            if stopping:
+                return
+    
+    def _write_batch(self, batch: List[Tuple[Optional[Tuple[CacheEntry, bytes]], Future, bool]]):
+        """Commit one batch from the write queue and resolve its futures"""
+        try:
+            self._flush_access_stats()
+        except Exception as e:
+            logger.error(f"Error storing access statistics: {e}")
+        
+        prepared = [p for p, _, _ in batch if p is not None]
+        try:
+            if prepared:
+                self._store_entries(prepared)
+        except Exception as e:
+            logger.error(f"Error storing {len(prepared)} cached files: {e}")
+            self.stats['errors'] += len(prepared)
+            for p, future, _ in batch:
+                if p is None:
+                    future.set_result(None)  # A flush request itself never fails
+                else:
+                    future.set_exception(e)
+        else:
+            for _, future, _ in batch:
+                future.set_result(None)
+    
+    def _store_entries(self, batch: List[Tuple[CacheEntry, bytes]]):
+        """Persist prepared entries with one transaction per database touched"""
+        by_partition: Dict[str, List[Tuple[CacheEntry, bytes]]] = defaultdict(list)
+        for entry, content in batch:
+            by_partition[entry.partition_key].append((entry, content))
+        entries = [entry for entry, _ in batch]
+        recorded = self._indexed_partitions([entry.path for entry in entries])
+        
+        # Store in partitions
+        for partition_id, items in by_partition.items():
+            self._store_in_partition(items, partition_id)
+        
+        # Update main index and vulnerabilities
+        self._update_index(entries)
+        
+        # A path hashed to another partition than the one recorded (the
+        # partition hash changed) would leave its old row there for good
+        moved: Dict[str, List[str]] = defaultdict(list)
+        for entry in entries:
+            previous = recorded.get(entry.path)
+            if previous and previous != entry.partition_key and previous in self.partitions:
+                moved[previous].append(entry.path)
+        for partition_id, paths in moved.items():
+            with self._get_db_connection(partition_id, write=True) as conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany('DELETE FROM partition_cache WHERE path = ?', [(path,) for path in paths])
+                conn.commit()
+        
+        # Update caches
+        with self._cache_lock:
+            for entry in entries:
+                self._cache[entry.path] = entry
+        
+        self.stats['cached_files'] += len(entries)
+    
+    def _indexed_partitions(self, paths: List[str]) -> Dict[str, str]:
+        """Partitions the main index records for those of paths it has"""
+        recorded = {}
+        with self._get_db_connection() as conn:
+            # Stay under SQLite's default limit on bound parameters
+            for start in range(0, len(paths), 500):
+                chunk = paths[start:start + 500]
+                recorded.update(conn.execute(
+                    f'SELECT path, partition_key FROM security_cache INDEXED BY idx_path_partition '
+                    f'WHERE path IN ({",".join("?" * len(chunk))})', chunk
+                ).fetchall())
+        return recorded
+    
+    def _store_in_partition(self, items: List[Tuple[CacheEntry, bytes]], partition_id: str):
         """Store content in partition database"""
-        with self._get_db_connection(partition_id) as conn:
-            conn.execute('''
+        with self._get_db_connection(partition_id, write=True) as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany('''
                 INSERT OR REPLACE INTO partition_cache 
-                (path, content, compressed, size, checksum)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (entry.path, content, entry.compressed, entry.size, entry.checksum))
+                (path, content, compressed, compression, size, checksum)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [
+                (entry.path, content, entry.compressed, entry.compression, entry.size, entry.checksum)
+                for entry, content in items
+            ])
             conn.commit()
     
-    def _update_index(self, entry: CacheEntry):
-        """Update main index with cache entry"""
-        with self._get_db_connection() as conn:
-            conn.execute('''
+    def _update_index(self, entries: List[CacheEntry]):
+        """Update main index with cache entries and their vulnerabilities"""
+        with self._get_db_connection(write=True) as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany('''
                 INSERT OR REPLACE INTO security_cache 
                 (path, checksum, size, modified_time, cached_time, compressed,
                  access_count, last_accessed, content_path, file_type, git_sha,
                  security_score, vulnerabilities, metadata, partition_key)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            ''', [(
                 entry.path, entry.checksum, entry.size, entry.modified_time,
                 entry.cached_time, entry.compressed, entry.access_count,
                 entry.last_accessed, entry.content_path, entry.file_type.value,
                 entry.git_sha, entry.security_score,
-                json.dumps(entry.vulnerabilities), json.dumps(entry.metadata),
+                _json_dumps(entry.vulnerabilities), _json_dumps(entry.metadata),
                 entry.partition_key
-            ))
+            ) for entry in entries])
+            self._insert_vulnerabilities(conn, [
+                (entry.path, vuln) for entry in entries for vuln in entry.vulnerabilities
+            ])
             conn.commit()
     
-    def _store_vulnerabilities(self, file_path: str, vulnerabilities: List[Dict[str, Any]]):
-        """Store detected vulnerabilities"""
-        with self._get_db_connection() as conn:
-            for vuln in vulnerabilities:
-                conn.execute('''
-                    INSERT INTO vulnerabilities 
-                    (file_path, vulnerability_type, severity, line_number, detected_time)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (
-                    file_path, vuln['type'], vuln['severity'], 
-                    vuln.get('line_number', -1), time.time()
-                ))
-            conn.commit()
+    def _insert_vulnerabilities(self, conn: sqlite3.Connection, found: List[Tuple[str, Dict[str, Any]]]):
+        """Insert (file path, vulnerability) pairs without committing"""
+        if not found:
+            return
+        detected_time = time.time()
+        conn.executemany('''
+            INSERT INTO vulnerabilities 
+            (file_path, vulnerability_type, severity, line_number, detected_time)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [
+            (file_path, vuln['type'], vuln['severity'], vuln.get('line_number', -1), detected_time)
+            for file_path, vuln in found
+        ])
     
     def update_from_git(self, base_ref: str = "HEAD~1", target_ref: str = "HEAD"):
         """Update cache based on git changes"""
@@ -772,43 +1697,55 @@ class ClaudeCacheSecurityEnhanced:
     def warm_cache_parallel(self, patterns: List[str], max_workers: int = None) -> Dict[str, Any]:
         """Parallel cache warming for large codebases"""
         start_time = time.time()
-        max_workers = max_workers or self.config.get("parallel_workers", 8)
+        max_workers = max_workers or self.config.get("parallel_workers", DEFAULT_WARM_WORKERS)
         
-        # Collect all files matching patterns
-        all_files = []
-        for pattern in patterns:
-            all_files.extend(glob.glob(pattern, recursive=True))
-        
-        # Remove duplicates and filter
-        all_files = list(set(all_files))
-        all_files = [f for f in all_files if self._should_cache_file(f)]
+        # Files are streamed from the directory walk straight to the workers
+        files = self._iter_warm_files(patterns)
         
+        with self._bulk_load():
+            return self._warm_files(files, max_workers, start_time)
+    
+    def _warm_files(self, files: Iterator[str], max_workers: int, start_time: float) -> Dict[str, Any]:
+        """Cache files on max_workers workers; the body of warm_cache_parallel"""
         # Parallel caching
+        files_processed = 0
         cached_count = 0
         error_count = 0
         total_size = 0
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_file = {
-                executor.submit(self.cache_file_enhanced, file_path): file_path
-                for file_path in all_files
-            }
-            
-            for future in as_completed(future_to_file):
-                file_path = future_to_file[future]
-                try:
-                    entry = future.result()
-                    if entry:
-                        cached_count += 1
-                        total_size += entry.size
-                except Exception as e:
-                    logger.error(f"Error caching {file_path}: {e}")
-                    error_count += 1
+        # Workers only read, hash and analyze; their results are queued
+        # for the writer thread, which commits them in large transactions
+        writes: List[Tuple[Future, int]] = []
+        
+        for file_path, future in _pooled_map(self._worker_pool(max_workers), self._prepare_file, files,
+                                             max_workers * WARM_IN_FLIGHT_PER_WORKER):
+            files_processed += 1
+            try:
+                prepared = future.result()
+                if prepared:
+                    entry, content = prepared
+                    cached_count += 1
+                    total_size += entry.size
+                    if content is not None:
+                        writes.append((self._queue_write(prepared, urgent=False), entry.size))
+            except Exception as e:
+                logger.error(f"Error caching {file_path}: {e}")
+                error_count += 1
+        
+        # Flush the tail instead of waiting out the batching interval
+        self._queue_write(None).result()
+        for write, size in writes:
+            if write.exception() is not None:
+                cached_count -= 1
+                total_size -= size
+                error_count += 1
+        
+        self._maybe_train_dictionary()
         
         duration = time.time() - start_time
         
         return {
-            "files_processed": len(all_files),
+            "files_processed": files_processed,
             "files_cached": cached_count,
             "errors": error_count,
             "total_size_mb": total_size / 1024 / 1024,
@@ -816,147 +1753,404 @@ class ClaudeCacheSecurityEnhanced:
             "files_per_second": cached_count / duration if duration > 0 else 0
         }
     
+    @contextmanager
+    def _bulk_load(self):
+        """Defer WAL checkpoints until the outermost warm-up finishes
+        
+        Commits then only append to the WAL; the databases are checkpointed
+        once at the end rather than every WAL_AUTOCHECKPOINT pages.
+        """
+        pools = [self._get_db_pool()] + [self._get_db_pool(pid) for pid in self.partitions]
+        with self._bulk_loads_lock:
+            self._bulk_loads += 1
+            if self._bulk_loads == 1:
+                for pool in pools:
+                    with pool.write_lock:
+                        pool.write_conn.execute("PRAGMA wal_autocheckpoint=0")
+        try:
+            yield
+        finally:
+            with self._bulk_loads_lock:
+                self._bulk_loads -= 1
+                if self._bulk_loads == 0:
+                    for pool in pools:
+                        with pool.write_lock:
+                            pool.write_conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                            pool.write_conn.execute(f"PRAGMA wal_autocheckpoint={WAL_AUTOCHECKPOINT}")
+    
+    def _load_zstd_dict(self) -> Optional[Any]:
+        """Adopt the dictionary file on disk, if another process trained one"""
+        try:
+            data = self.zstd_dict_file.read_bytes()
+        except FileNotFoundError:
+            return None
+        with self._zstd_dict_lock:
+            if self._zstd_dict is None:
+                self._zstd_dict = zstandard.ZstdCompressionDict(data)
+            return self._zstd_dict
+    
+    def _zstd_dict_for(self, codec: Optional[str]) -> Optional[Any]:
+        """The dictionary content compressed with codec needs, if any"""
+        dict_id = _zstd_dict_id(codec)
+        if dict_id is None:
+            return None
+        dictionary = self._zstd_dict or self._load_zstd_dict()
+        if dictionary is not None and dict_id not in (0, dictionary.dict_id()):
+            raise ValueError(f"content was compressed with zstd dictionary {dict_id}, "
+                             f"but {self.zstd_dict_file} holds {dictionary.dict_id()}")
+        return dictionary
+    
+    def _worker_pool(self, size: int) -> ThreadPoolExecutor:
+        """The long-lived pool of warm-up and scan workers with size threads"""
+        with self._worker_pools_lock:
+            pool = self._worker_pools.get(size)
+            if pool is None:
+                pool = self._worker_pools[size] = ThreadPoolExecutor(
+                    max_workers=size, thread_name_prefix=f"worker{size}",
+                    initializer=self._init_pool_thread
+                )
+            return pool
+    
+    def _init_pool_thread(self):
+        """Executor initializer: let the new thread run on every allowed CPU"""
+        if self._allowed_cpus is not None:
+            try:
+                os.sched_setaffinity(0, self._allowed_cpus)
+            except OSError as e:
+                logger.debug(f"Could not reset pool thread affinity: {e}")
+    
+    def _maybe_train_dictionary(self):
+        """Train the zstd dictionary once, when enabled and not yet trained"""
+        if (zstandard is None or self._zstd_dict is not None
+                or not self.config.get("compression_dictionary", True)
+                or self.config.get("compression_codec", "zstd") != "zstd"):
+            return
+        if self._load_zstd_dict() is not None:
+            return
+        try:
+            self.train_compression_dictionary()
+        except Exception as e:
+            logger.warning(f"Could not train compression dictionary: {e}")
+    
+    def train_compression_dictionary(self, samples: int = ZSTD_DICT_SAMPLES) -> bool:
+        """Train a zstd dictionary on a sample of cached files and persist it
+        
+        Content compressed afterwards uses the dictionary. Returns False if
+        a dictionary already exists or too few files are cached to train one.
+        """
+        if self._zstd_dict is not None or self._load_zstd_dict() is not None:
+            return False
+        
+        with self._get_db_connection() as conn:
+            paths = [row[0] for row in conn.execute(
+                'SELECT path FROM security_cache ORDER BY RANDOM() LIMIT ?', (samples,)
+            )]
+        contents = []
+        budget = ZSTD_DICT_TRAINING_BYTES
+        for path in paths:
+            prefix = self.get_cached_content_prefix(path, min(ZSTD_DICT_SAMPLE_BYTES, budget))
+            if prefix and prefix[0]:
+                contents.append(prefix[0])
+                budget -= len(prefix[0])
+                if budget <= 0:
+                    break
+        try:
+            dictionary = zstandard.train_dictionary(ZSTD_DICT_SIZE, contents)
+        except zstandard.ZstdError as e:
+            logger.info(f"Not enough cached content for a compression dictionary yet: {e}")
+            return False
+        
+        # Publish with link(), which fails rather than replace a dictionary
+        # another process published first; that one is adopted instead
+        tmp_file = self.zstd_dict_file.with_name(f"{self.zstd_dict_file.name}.{os.getpid()}.{get_ident()}.tmp")
+        try:
+            tmp_file.write_bytes(dictionary.as_bytes())
+            os.link(tmp_file, self.zstd_dict_file)
+        except FileExistsError:
+            self._load_zstd_dict()
+            logger.info("Another process published a zstd dictionary first; using it")
+            return False
+        finally:
+            tmp_file.unlink(missing_ok=True)
+        
+        with self._zstd_dict_lock:
+            self._zstd_dict = dictionary
+        logger.info(f"Trained zstd dictionary on {len(contents)} cached files")
+        return True
+    
+    def _iter_warm_files(self, patterns: List[str]) -> Iterator[str]:
+        """Yield the cacheable files matching any of the glob patterns
+        
+        Directories are walked lazily. Walked files are filtered from their
+        directory entries: one stat for the size, and no path resolution
+        unless the file is a symlink or the walk starts outside the allowed
+        directories.
+        """
+        extensions = frozenset(ext.lower() for ext in self.config.get("allowed_extensions", []))
+        max_size = self.config.get("max_file_size_mb", 50) * 1024 * 1024
+        # Only overlapping patterns can produce the same path twice
+        seen: Optional[Set[str]] = set() if len(patterns) > 1 else None
+        
+        for pattern in patterns:
+            if not glob.has_magic(pattern):
+                matches = iter([pattern] if self._should_cache_file(pattern) else [])
+            else:
+                # Walk from the longest literal directory prefix
+                components = pattern.split('/')
+                literal = 0
+                while literal < len(components) - 1 and not glob.has_magic(components[literal]):
+                    literal += 1
+                root = '/'.join(components[:literal]) or ('/' if pattern.startswith('/') else '.')
+                rest = components[literal:]
+                max_depth = None if any('**' in c for c in rest) else len(rest)
+                regex = _glob_to_regex(pattern)
+                root_allowed = self._validate_path(root)
+                # Walked paths below '.' are reported without the './'
+                strip = 2 if root == '.' else 0
+                
+                matches = (
+                    entry.path[strip:] for entry in _walk_fast(root, extensions, max_depth)
+                    if regex.match(entry.path[strip:])
+                    and self._should_cache_entry(entry, max_size, root_allowed)
+                )
+            
+            for path in matches:
+                if seen is not None:
+                    if path in seen:
+                        continue
+                    seen.add(path)
+                yield path
+    
     def _should_cache_file(self, file_path: str) -> bool:
         """Check if file should be cached"""
         try:
-            path = Path(file_path)
-            if not path.exists() or not path.is_file():
-                return False
-            
             # Check extension
-            ext = path.suffix.lower()
+            ext = os.path.splitext(file_path)[1].lower()
             allowed_extensions = self.config.get("allowed_extensions", [])
             if ext not in allowed_extensions:
                 return False
             
-            # Check size
+            # Check type and size
+            stat_result = os.stat(file_path)
             max_size = self.config.get("max_file_size_mb", 50) * 1024 * 1024
-            if path.stat().st_size > max_size:
+            if not stat.S_ISREG(stat_result.st_mode) or stat_result.st_size > max_size:
                 return False
             
             # Check if in allowed directories
-            return self._validate_path(str(path))
+            return self._validate_path(file_path)
             
         except Exception:
             return False
     
+    def _should_cache_entry(self, entry: os.DirEntry, max_size: int, root_allowed: bool) -> bool:
+        """Check if a walked file should be cached; its extension already has been
+        
+        root_allowed says the walk started inside the allowed directories,
+        which then contain every walked file that is not a symlink.
+        """
+        try:
+            if entry.stat().st_size > max_size:
+                return False
+            if root_allowed and not entry.is_symlink():
+                return True
+            return self._validate_path(entry.path)
+        except OSError:
+            return False
+    
     def get_security_report(self) -> Dict[str, Any]:
         """Generate comprehensive security report"""
         with self._get_db_connection() as conn:
-            # Overall statistics
-            cursor = conn.execute('''
-                SELECT 
-                    COUNT(*) as total_files,
-                    AVG(security_score) as avg_security_score,
-                    COUNT(CASE WHEN security_score < 50 THEN 1 END) as high_risk_files
-                FROM security_cache
-            ''')
-            stats = dict(cursor.fetchone())
-            
-            # Vulnerability breakdown
-            cursor = conn.execute('''
-                SELECT 
-                    severity,
-                    vulnerability_type,
-                    COUNT(*) as count
-                FROM vulnerabilities
-                WHERE resolved = 0
-                GROUP BY severity, vulnerability_type
-                ORDER BY severity, count DESC
-            ''')
-            vulnerabilities = [dict(row) for row in cursor.fetchall()]
-            
-            # Most vulnerable files
-            cursor = conn.execute('''
-                SELECT 
-                    path,
-                    security_score,
-                    vulnerabilities
-                FROM security_cache
-                WHERE security_score < 70
-                ORDER BY security_score ASC
-                LIMIT 20
-            ''')
-            vulnerable_files = [dict(row) for row in cursor.fetchall()]
-            
-            return {
-                "summary": stats,
-                "vulnerabilities": vulnerabilities,
-                "vulnerable_files": vulnerable_files,
-                "generated_at": datetime.now().isoformat()
-            }
+            # One read transaction, so all three parts see the same snapshot
+            conn.execute('BEGIN DEFERRED')
+            try:
+                return self._security_report(conn)
+            finally:
+                conn.rollback()
+    
+    def _security_report(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        """Report queries for get_security_report, run on one connection"""
+        # Overall statistics
+        cursor = conn.execute('''
+            SELECT 
+                COUNT(*) as total_files,
+                AVG(security_score) as avg_security_score,
+                COUNT(CASE WHEN security_score < 50 THEN 1 END) as high_risk_files
+            FROM security_cache
+        ''')
+        stats = dict(cursor.fetchone())
+        
+        # Vulnerability breakdown
+        cursor = conn.execute('''
+            SELECT 
+                severity,
+                vulnerability_type,
+                COUNT(*) as count
+            FROM vulnerabilities
+            WHERE resolved = 0
+            GROUP BY severity, vulnerability_type
+            ORDER BY severity, count DESC
+        ''')
+        vulnerabilities = [dict(row) for row in cursor.fetchall()]
+        
+        # Most vulnerable files
+        cursor = conn.execute('''
+            SELECT 
+                path,
+                security_score,
+                CAST(vulnerabilities AS TEXT) AS vulnerabilities
+            FROM security_cache
+            WHERE security_score < 70
+            ORDER BY security_score ASC
+            LIMIT 20
+        ''')
+        vulnerable_files = [dict(row) for row in cursor.fetchall()]
+        
+        return {
+            "summary": stats,
+            "vulnerabilities": vulnerabilities,
+            "vulnerable_files": vulnerable_files,
+            "generated_at": datetime.now().isoformat()
+        }
     
-    def scan_all_vulnerabilities(self):
-        """Scan all cached files for vulnerabilities"""
+    def scan_all_vulnerabilities(self, max_workers: int = None):
+        """Scan all cached files for vulnerabilities
+        
+        Files are read and analyzed on a thread per CPU; decompression and
+        Hyperscan release the GIL. Results are written from this thread.
+        """
+        max_workers = max_workers or os.cpu_count() or 4
+        
         with self._get_db_connection() as conn:
             cursor = conn.execute('SELECT path FROM security_cache WHERE file_type = ?', 
                                 (FileType.SOURCE_CODE.value,))
             files = [row[0] for row in cursor.fetchall()]
         
         updated_count = 0
-        for file_path in files:
+        # (file path, score, vulnerabilities), committed WRITE_BATCH_SIZE at a time
+        results: List[Tuple[str, float, List[Dict[str, Any]]]] = []
+        for file_path, future in _pooled_map(self._worker_pool(max_workers), self._scan_cached_file, files,
+                                             max_workers * WARM_IN_FLIGHT_PER_WORKER):
             try:
-                content = self.get_cached_content(file_path)
-                if content:
-                    score, vulns = self.security_analyzer.analyze_content(
-                        content.decode('utf-8', errors='ignore'),
-                        file_path
-                    )
-                    
-                    # Update security score
-                    with self._get_db_connection() as conn:
-                        conn.execute('''
-                            UPDATE security_cache 
-                            SET security_score = ?, vulnerabilities = ?
-                            WHERE path = ?
-                        ''', (score, json.dumps(vulns), file_path))
-                        conn.commit()
-                    
-                    # Update vulnerabilities table
-                    if vulns:
-                        self._store_vulnerabilities(file_path, vulns)
-                    
-                    updated_count += 1
-                    
+                result = future.result()
             except Exception as e:
                 logger.error(f"Error scanning {file_path}: {e}")
+                continue
+            if result:
+                results.append(result)
+                if len(results) >= WRITE_BATCH_SIZE:
+                    self._store_scan_results(results)
+                    updated_count += len(results)
+                    results = []
+        
+        if results:
+            self._store_scan_results(results)
+            updated_count += len(results)
         
         logger.info(f"Vulnerability scan completed: {updated_count} files scanned")
     
+    def _scan_cached_file(self, file_path: str) -> Optional[Tuple[str, float, List[Dict[str, Any]]]]:
+        """Analyze the cached content of a file"""
+        content = self.get_cached_content(file_path)
+        if not content:
+            return None
+        score, vulns = self.security_analyzer.analyze_content(content, file_path)
+        return file_path, score, vulns
+    
+    def _store_scan_results(self, results: List[Tuple[str, float, List[Dict[str, Any]]]]):
+        """Update scores and record vulnerabilities of scanned files in one transaction"""
+        with self._get_db_connection(write=True) as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany('''
+                UPDATE security_cache 
+                SET security_score = ?, vulnerabilities = ?
+                WHERE path = ?
+            ''', [(score, _json_dumps(vulns), file_path) for file_path, score, vulns in results])
+            self._insert_vulnerabilities(conn, [
+                (file_path, vuln) for file_path, _, vulns in results for vuln in vulns
+            ])
+            conn.commit()
+    
     def get_cached_content(self, file_path: str) -> Optional[bytes]:
         """Retrieve cached content"""
-        # Check memory caches first
-        with self._db_lock:
-            if file_path in self._memory_cache:
-                entry = self._memory_cache[file_path]
-                return self._read_cached_content(entry)
-            
-            if file_path in self._ttl_cache:
-                entry = self._ttl_cache[file_path]
-                self._memory_cache[file_path] = entry  # Promote to hot cache
-                return self._read_cached_content(entry)
+        partition_key = self._locate_partition(file_path)
+        if partition_key:
+            return self._read_cached_content(file_path, partition_key)
+        
+        return None
+    
+    def get_cached_content_prefix(self, file_path: str, n: int) -> Optional[Tuple[bytes, int]]:
+        """Retrieve the first n bytes of cached content and its full size"""
+        partition_key = self._locate_partition(file_path)
+        if partition_key:
+            return self._read_cached_prefix(file_path, partition_key, n)
+        
+        return None
+    
+    def _locate_partition(self, file_path: str) -> Optional[str]:
+        """Partition holding a cached file's content, or None if not cached
+        
+        Misses in the memory cache are answered from the covering index on
+        (path, partition_key), without loading or parsing the whole row.
+        """
+        with self._cache_lock:
+            entry = self._cache.get(file_path)
+        if entry is not None:
+            return entry.partition_key
         
-        # Check database
-        entry = self._get_cache_entry(file_path)
-        if entry:
-            return self._read_cached_content(entry)
+        with self._get_db_connection() as conn:
+            row = conn.execute(
+                'SELECT partition_key FROM security_cache INDEXED BY idx_path_partition WHERE path = ?',
+                (file_path,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def _read_cached_prefix(self, file_path: str, partition_key: str, n: int) -> Optional[Tuple[bytes, int]]:
+        """Read a content prefix from partition without materializing the blob"""
+        try:
+            with self._get_db_connection(partition_key) as conn:
+                # Uncompressed blobs are sliced inside SQLite; compressed
+                # ones are streamed through a blob handle when possible
+                cursor = conn.execute(f'''
+                    SELECT rowid, size, compressed, compression,
+                           CASE WHEN compressed THEN {'NULL' if SQLITE_BLOB_IO else 'content'}
+                                ELSE substr(content, 1, ?) END AS content
+                    FROM partition_cache WHERE path = ?
+                ''', (n, file_path))
+                row = cursor.fetchone()
+                
+                if row:
+                    content = row['content']
+                    if row['compressed']:
+                        # Inflate only as much of the stream as needed
+                        dictionary = self._zstd_dict_for(row['compression'])
+                        if content is None:
+                            with conn.blobopen('partition_cache', 'content', row['rowid'],
+                                               readonly=True) as blob:
+                                content = _decompress_from(blob, row['compression'], n, dictionary)
+                        else:
+                            content = _decompress(content, row['compression'], n, dictionary=dictionary)
+                    return bytes(content), row['size']
+                    
+        except Exception as e:
+            logger.error(f"Error reading cached content: {e}")
         
         return None
     
-    def _read_cached_content(self, entry: CacheEntry) -> Optional[bytes]:
+    def _read_cached_content(self, file_path: str, partition_key: str) -> Optional[bytes]:
         """Read content from partition"""
         try:
-            with self._get_db_connection(entry.partition_key) as conn:
+            with self._get_db_connection(partition_key) as conn:
                 cursor = conn.execute(
-                    'SELECT content, compressed FROM partition_cache WHERE path = ?',
-                    (entry.path,)
+                    'SELECT content, compressed, compression, size FROM partition_cache WHERE path = ?',
+                    (file_path,)
                 )
                 row = cursor.fetchone()
                 
                 if row:
                     content = row['content']
                     if row['compressed']:
-                        content = gzip.decompress(content)
+                        content = _decompress(content, row['compression'], size_hint=row['size'],
+                                              dictionary=self._zstd_dict_for(row['compression']))
                     return content
                     
         except Exception as e:
@@ -968,61 +2162,60 @@ class ClaudeCacheSecurityEnhanced:
         """Get cache entry from database"""
         with self._get_db_connection() as conn:
             cursor = conn.execute(
-                'SELECT * FROM security_cache WHERE path = ?',
+                f'SELECT {CACHE_ENTRY_COLUMNS} FROM security_cache WHERE path = ?',
                 (file_path,)
             )
-            row = cursor.fetchone()
-            
-            if row:
-                return CacheEntry(
-                    path=row['path'],
-                    checksum=row['checksum'],
-                    size=row['size'],
-                    modified_time=row['modified_time'],
-                    cached_time=row['cached_time'],
-                    compressed=bool(row['compressed']),
-                    access_count=row['access_count'],
-                    last_accessed=row['last_accessed'],
-                    content_path=row['content_path'],
-                    file_type=FileType(row['file_type']),
-                    git_sha=row['git_sha'],
-                    security_score=row['security_score'],
-                    vulnerabilities=json.loads(row['vulnerabilities'] or '[]'),
-                    metadata=json.loads(row['metadata'] or '{}'),
-                    partition_key=row['partition_key']
-                )
-        
-        return None
+            # Build the entry straight from the row tuple rather than through
+            # a sqlite3.Row looked up by column name
+            cursor.row_factory = _cache_entry_from_row
+            return cursor.fetchone()
     
     def _update_access_stats(self, file_path: str):
-        """Update access statistics"""
-        with self._get_db_connection() as conn:
-            conn.execute('''
+        """Update access statistics
+        
+        Hits are tallied in memory; the writer thread commits them within
+        WRITE_FLUSH_INTERVAL, many per transaction.
+        """
+        now = time.time()
+        with self._access_lock:
+            pending = self._pending_access.get(file_path)
+            if pending is None:
+                self._pending_access[file_path] = [1, now]
+            else:
+                pending[0] += 1
+                pending[1] = now
+            wake_writer = len(self._pending_access) == 1
+        
+        # The first pending hit asks the writer for a flush; later ones ride along
+        if wake_writer:
+            self._queue_write(None, urgent=False)
+        
+        self.stats['cache_hits'] += 1
+    
+    def _flush_access_stats(self):
+        """Commit the access counts tallied since the last flush"""
+        with self._access_lock:
+            pending, self._pending_access = self._pending_access, {}
+        if not pending:
+            return
+        
+        with self._get_db_connection(write=True) as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany('''
                 UPDATE security_cache 
-                SET access_count = access_count + 1,
+                SET access_count = access_count + ?,
                     last_accessed = ?
                 WHERE path = ?
-            ''', (time.time(), file_path))
+            ''', [(hits, last_accessed, path) for path, (hits, last_accessed) in pending.items()])
             conn.commit()
-        
-        self.stats['cache_hits'] += 1
     
     def _rebalance_partitions(self):
         """Rebalance partitions for optimal performance"""
         # Analyze partition sizes
-        partition_stats = {}
-        
-        for partition_id, partition in self.partitions.items():
-            with self._get_db_connection(partition_id) as conn:
-                cursor = conn.execute('SELECT COUNT(*) as count, SUM(size) as total_size FROM partition_cache')
-                row = cursor.fetchone()
-                partition_stats[partition_id] = {
-                    'count': row['count'] or 0,
-                    'size': row['total_size'] or 0
-                }
+        partition_stats = self._partition_stats()
         
         # Check if rebalancing is needed
-        sizes = [stats['size'] for stats in partition_stats.values()]
+        sizes = [total_size for _, total_size in partition_stats.values()]
         if not sizes or max(sizes) / (min(sizes) + 1) < 2:
             return  # Partitions are reasonably balanced
         
@@ -1042,11 +2235,10 @@ class ClaudeCacheSecurityEnhanced:
             memory_info = process.memory_info()
             
             # Partition balance
-            partition_sizes = {}
-            for partition_id in self.partitions:
-                with self._get_db_connection(partition_id) as conn:
-                    cursor = conn.execute('SELECT COUNT(*) as count FROM partition_cache')
-                    partition_sizes[partition_id] = cursor.fetchone()['count']
+            partition_sizes = {
+                partition_id: file_count
+                for partition_id, (file_count, _) in self._partition_stats().items()
+            }
             
             metrics = {
                 "cache_hits": self.stats['cache_hits'],
@@ -1056,15 +2248,13 @@ class ClaudeCacheSecurityEnhanced:
                 "total_operations": sum(self.stats.values()),
                 "errors": self.stats.get('errors', 0),
                 "memory_usage_mb": memory_info.rss / 1024 / 1024,
-                "memory_cache_size": len(self._memory_cache),
-                "ttl_cache_size": len(self._ttl_cache),
+                "memory_cache_size": len(self._cache),
                 "partition_balance": partition_sizes,
-                "io_threads": self._io_executor._threads,
-                "cpu_workers": self._cpu_executor._max_workers
+                "io_threads": len(self._io_executor._threads)
             }
             
             # Store metrics
-            with self._get_db_connection() as conn:
+            with self._get_db_connection(write=True) as conn:
                 conn.execute('''
                     INSERT INTO performance_metrics
                     (timestamp, cache_hits, cache_misses, avg_response_time_ms, 
@@ -1072,7 +2262,7 @@ class ClaudeCacheSecurityEnhanced:
                     VALUES (?, ?, ?, ?, ?, ?)
                 ''', (
                     time.time(), metrics['cache_hits'], metrics['cache_misses'],
-                    0, metrics['memory_usage_mb'], json.dumps(partition_sizes)
+                    0, metrics['memory_usage_mb'], _json_dumps(partition_sizes)
                 ))
                 conn.commit()
             
@@ -1081,50 +2271,65 @@ class ClaudeCacheSecurityEnhanced:
     def _validate_path(self, file_path: str) -> bool:
         """Validate that path is within allowed directories"""
         try:
-            resolved_path = Path(file_path).resolve()
-            
-            for allowed_dir in self.allowed_dirs:
-                allowed_path = Path(allowed_dir).resolve()
-                try:
-                    resolved_path.relative_to(allowed_path)
-                    return True
-                except ValueError:
-                    continue
-            
-            return False
+            # Trailing separator, so a directory itself counts as inside
+            resolved_path = os.path.join(os.path.realpath(file_path), '')
+            return resolved_path.startswith(_resolve_roots(tuple(self.allowed_dirs)))
             
         except Exception:
             return False
     
     def _remove_from_cache(self, file_path: str):
         """Remove file from cache"""
-        entry = self._get_cache_entry(file_path)
-        if not entry:
-            return
-        
-        # Remove from partition
-        with self._get_db_connection(entry.partition_key) as conn:
-            conn.execute('DELETE FROM partition_cache WHERE path = ?', (file_path,))
-            conn.commit()
-        
-        # Remove from main index
-        with self._get_db_connection() as conn:
-            conn.execute('DELETE FROM security_cache WHERE path = ?', (file_path,))
+        # Remove from main index, learning the content's partition on the way
+        with self._get_db_connection(write=True) as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            if SQLITE_RETURNING:
+                rows = conn.execute(
+                    'DELETE FROM security_cache WHERE path = ? RETURNING partition_key',
+                    (file_path,)
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    'SELECT partition_key FROM security_cache WHERE path = ?', (file_path,)
+                ).fetchall()
+                conn.execute('DELETE FROM security_cache WHERE path = ?', (file_path,))
             conn.execute('DELETE FROM vulnerabilities WHERE file_path = ?', (file_path,))
             conn.commit()
         
-        # Remove from memory caches
-        with self._db_lock:
-            self._memory_cache.pop(file_path, None)
-            self._ttl_cache.pop(file_path, None)
+        # Remove from partition
+        partition_key = rows[0][0] if rows else None
+        if partition_key:
+            with self._get_db_connection(partition_key, write=True) as conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.execute('DELETE FROM partition_cache WHERE path = ?', (file_path,))
+                conn.commit()
+        
+        # Remove from memory cache
+        with self._cache_lock:
+            self._cache.pop(file_path, None)
     
     def cleanup(self):
         """Cleanup resources"""
+        # Let the writer commit whatever is still queued
+        self._write_queue.put(None)
+        self._writer_thread.join()
+        
         self._io_executor.shutdown(wait=True)
-        self._cpu_executor.shutdown(wait=True)
+        with self._worker_pools_lock:
+            for pool in self._worker_pools.values():
+                pool.shutdown(wait=True)
+            self._worker_pools.clear()
+        
+        # Hits recorded after the writer's last batch
+        self._flush_access_stats()
+        
+        for pool in self._db_pools.values():
+            pool.close()
         
-        for conn in self._db_pools.values():
-            conn.close()
+        with self._stats_readers_lock:
+            for conn, _ in self._stats_readers or ():
+                conn.close()
+            self._stats_readers = None
 
 
 # CLI Interface for testing
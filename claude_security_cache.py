@@ -472,6 +472,8 @@ class claudeSecurityCache:
                     FOREIGN KEY (file_path) REFERENCES claude_cache(path)
                 )
             ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_claude_vuln_resolved_sev '
+                         'ON claude_vulnerabilities(resolved, severity)')
             
             # Performance metrics table
             conn.execute('''
@@ -496,6 +498,9 @@ class claudeSecurityCache:
     def _init_partition_db(self, partition: CachePartition):
         """Initialize partition-specific database"""
         with sqlite3.connect(str(partition.db_file)) as conn:
+            # Lets optimize reclaim free pages incrementally; only takes
+            # effect on a new database
+            conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
             conn.execute('''
                 CREATE TABLE IF NOT EXISTS claude_partition_cache (
                     path TEXT PRIMARY KEY,
@@ -943,16 +948,16 @@ class claudeSecurityCache:
     
     def get_cached_content(self, file_path: str) -> Optional[bytes]:
         """Retrieve cached content"""
-        # Check memory caches first
+        # Check memory caches first; the content is read after releasing the
+        # lock, which _get_db_connection takes again
         with self._db_lock:
-            if file_path in self._memory_cache:
-                entry = self._memory_cache[file_path]
-                return self._read_cached_content(entry)
-            
-            if file_path in self._ttl_cache:
-                entry = self._ttl_cache[file_path]
-                self._memory_cache[file_path] = entry  # Promote to hot cache
-                return self._read_cached_content(entry)
+            entry = self._memory_cache.get(file_path)
+            if entry is None:
+                entry = self._ttl_cache.get(file_path)
+                if entry is not None:
+                    self._memory_cache[file_path] = entry  # Promote to hot cache
+        if entry is not None:
+            return self._read_cached_content(entry)
         
         # Check database
         entry = self._get_cache_entry(file_path)
@@ -1082,7 +1087,7 @@ class claudeSecurityCache:
                 "memory_cache_size": len(self._memory_cache),
                 "ttl_cache_size": len(self._ttl_cache),
                 "partition_balance": partition_sizes,
-                "io_threads": self._io_executor._threads,
+                "io_threads": len(self._io_executor._threads),
                 "cpu_workers": self._cpu_executor._max_workers,
                 "avg_security_score": avg_security_score,
                 "active_vulnerabilities": active_vulnerabilities,
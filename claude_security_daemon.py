@@ -6,17 +6,28 @@ High-performance daemon for enterprise security analysis
 
 import os
 import sys
+import gc
+import codecs
 import json
 import time
 import socket
+import sqlite3
+import asyncio
 import threading
 import signal
 import argparse
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Union, Callable
 from dataclasses import asdict
+from concurrent.futures import ThreadPoolExecutor
 import psutil
+
+try:
+    import orjson  # Rust-backed JSON, encodes straight to bytes
+except ImportError:
+    orjson = None
+
 from claude_security_cache import claudeSecurityCache, FileType
 
 # Setup logging
@@ -26,6 +37,181 @@ logging.basicConfig(
 )
 logger = logging.getLogger("claudeDaemon")
 
+# Wire protocol: each message is a 4-byte big-endian length followed by JSON
+FRAME_HEADER_SIZE = 4
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+# Seconds between the monitor's metrics log lines
+MONITOR_INTERVAL = 60
+
+# Threads running command handlers; further requests queue for a free one
+HANDLER_WORKERS = 64
+
+# Initial size of each thread's reusable receive buffer; it grows to the
+# largest message received
+RECV_BUFFER_SIZE = 64 * 1024
+_recv_buffers = threading.local()
+
+# How long a get_performance_metrics result is reused by stats, metrics,
+# health and the monitor
+METRICS_TTL = 1.0
+
+# Characters of file content returned by the get command
+GET_PREVIEW_CHARS = 1000
+
+# Resident memory above which optimize also forces a garbage collection;
+# each collection raises the bar to half again the RSS it left behind
+GC_RSS_THRESHOLD_MB = 512
+
+# Unresolved-vulnerability queries; fixed SQL text keeps them in the
+# connection's prepared statement cache
+VULNERABILITIES_LIMIT = 100
+VULNERABILITY_FILTERS = ('WHERE resolved = 0', 'WHERE resolved = 0 AND severity = ?')
+VULNERABILITY_COUNT_SQL = tuple(f'SELECT COUNT(*) FROM claude_vulnerabilities {where}'
+                                for where in VULNERABILITY_FILTERS)
+VULNERABILITY_ROWS_SQL = tuple(f'SELECT * FROM claude_vulnerabilities {where} LIMIT {VULNERABILITIES_LIMIT}'
+                               for where in VULNERABILITY_FILTERS)
+
+
+def _send_framed(sock: socket.socket, payload: bytes):
+    """Send one length-prefixed message"""
+    sock.sendall(len(payload).to_bytes(FRAME_HEADER_SIZE, 'big') + payload)
+
+
+def _recv_exact(sock: socket.socket, view: memoryview) -> bool:
+    """Fill view from the socket, or return False if the peer closed first"""
+    received = 0
+    n = len(view)
+    while received < n:
+        chunk = sock.recv_into(view[received:])
+        if not chunk:
+            return False
+        received += chunk
+    return True
+
+
+def _recv_framed(sock: socket.socket) -> Optional[memoryview]:
+    """Receive one length-prefixed message, or None on clean EOF
+    
+    The message is read into the calling thread's reusable buffer, so it
+    must be consumed before the thread receives the next one.
+    """
+    buf = getattr(_recv_buffers, 'buf', None)
+    if buf is None:
+        buf = _recv_buffers.buf = bytearray(RECV_BUFFER_SIZE)
+    if not _recv_exact(sock, memoryview(buf)[:FRAME_HEADER_SIZE]):
+        return None
+    length = int.from_bytes(buf[:FRAME_HEADER_SIZE], 'big')
+    if length > MAX_FRAME_SIZE:
+        raise ValueError(f'Frame too large: {length} bytes')
+    if length > len(buf):
+        buf = _recv_buffers.buf = bytearray(length)
+    view = memoryview(buf)[:length]
+    if not _recv_exact(sock, view):
+        return None
+    return view
+
+
+# Fixed parts of the claude_info and stats responses
+CLAUDE_INFO = {
+    'name': 'claude Security Cache System',
+    'version': '3.0',
+    'description': 'Advanced security analysis for enterprise codebases',
+    'features': (
+        'Real-time vulnerability detection',
+        'Git-based incremental updates',
+        'Intelligent cache partitioning',
+        'Security-focused warming strategies',
+        'Comprehensive security reporting'
+    ),
+    'enterprise_ready': True
+}
+DAEMON_TYPE = 'claude Security Daemon v3.0'
+
+# Partition databases worked on at once by clear and optimize
+PARTITION_WORKERS = 8
+
+# Clearing empties each database in one transaction and then truncates
+# its WAL, instead of leaving the deleted pages to the next checkpoint
+CLEAR_PARTITION_SCRIPT = '''
+    BEGIN IMMEDIATE;
+    DELETE FROM claude_partition_cache;
+    COMMIT;
+    PRAGMA wal_checkpoint(TRUNCATE);
+'''
+CLEAR_INDEX_SCRIPT = '''
+    BEGIN IMMEDIATE;
+    DELETE FROM claude_cache;
+    DELETE FROM claude_vulnerabilities;
+    DELETE FROM claude_git_commits;
+    COMMIT;
+    PRAGMA wal_checkpoint(TRUNCATE);
+'''
+
+
+def _clear_partition(db_file: Path):
+    """Empty a partition database on a dedicated connection"""
+    conn = sqlite3.connect(str(db_file), timeout=30)
+    try:
+        conn.executescript(CLEAR_PARTITION_SCRIPT)
+    finally:
+        conn.close()
+
+
+def _vacuum_partition(db_file: Path) -> float:
+    """Reclaim a partition database's free pages; returns the seconds taken"""
+    start = time.monotonic()
+    conn = sqlite3.connect(str(db_file), timeout=30)
+    try:
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            # Partitions created before incremental mode need one full rebuild
+            conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            conn.execute('VACUUM')
+        else:
+            # executescript steps the pragma until the freelist is empty
+            conn.executescript('PRAGMA incremental_vacuum;')
+        conn.execute('PRAGMA optimize')
+    finally:
+        conn.close()
+    return time.monotonic() - start
+
+
+def _preview_text(content: bytes, chars: int) -> str:
+    """The first chars characters of content decoded as UTF-8, ignoring errors
+    
+    Same result as content.decode('utf-8', errors='ignore')[:chars], but only
+    decodes as many bytes as that takes.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    view = memoryview(content)
+    # A character is at most 4 bytes, so one step usually suffices
+    step = 4 * chars
+    parts = []
+    decoded = 0
+    for offset in range(0, len(view), step):
+        part = decoder.decode(view[offset:offset + step])
+        parts.append(part)
+        decoded += len(part)
+        if decoded >= chars:
+            break
+    else:
+        parts.append(decoder.decode(b'', final=True))
+    return ''.join(parts)[:chars]
+
+
+def _dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize a request or response to UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode('utf-8')
+
+
+def _loads(data: Union[bytes, bytearray, memoryview]) -> Any:
+    """Parse a request or response from UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data).decode('utf-8'))
+
 class claudeSecurityDaemon:
     """High-performance daemon for claude security cache operations"""
     
@@ -33,85 +219,129 @@ class claudeSecurityDaemon:
         self.host = host
         self.port = port
         self.cache = claudeSecurityCache()
-        self.server_socket = None
         self.running = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._writers: set = set()
+        self._pool = ThreadPoolExecutor(max_workers=HANDLER_WORKERS, thread_name_prefix='claude-io')
+        
+        # Last performance metrics as (monotonic timestamp, metrics); the
+        # lock makes concurrent pollers share one refresh
+        self._metrics_cache: Tuple[float, Optional[Dict[str, Any]]] = (0.0, None)
+        self._metrics_lock = threading.Lock()
+        self._gc_threshold = GC_RSS_THRESHOLD_MB * 1024 * 1024
+        
+        # The analyzer loads its patterns once
+        self._security_pattern_count = len(self.cache.security_analyzer.patterns)
         self.stats = {
             'requests_handled': 0,
             'errors': 0,
-            'start_time': time.time(),
+            'start_time': time.monotonic(),  # for uptime; not a wall-clock time
             'vulnerabilities_detected': 0
         }
         
-        # Command handlers
-        self.handlers = {
-            'cache': self._handle_cache,
-            'warm': self._handle_warm,
-            'get': self._handle_get,
-            'stats': self._handle_stats,
-            'security_report': self._handle_security_report,
-            'git_update': self._handle_git_update,
-            'scan': self._handle_scan,
-            'check': self._handle_check,
-            'metrics': self._handle_metrics,
-            'health': self._handle_health,
-            'set_repo': self._handle_set_repo,
-            'vulnerabilities': self._handle_vulnerabilities,
-            'clear': self._handle_clear,
-            'optimize': self._handle_optimize,
-            'claude_info': self._handle_claude_info
+        # Command handlers; each entry pulls its own params, so requests
+        # skip keyword-argument unpacking
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            'cache': lambda p: self._handle_cache(p['file_path'], p.get('force', False)),
+            'warm': lambda p: self._handle_warm(p['patterns']),
+            'get': lambda p: self._handle_get(p['file_path']),
+            'stats': lambda p: self._handle_stats(),
+            'security_report': lambda p: self._handle_security_report(),
+            'git_update': lambda p: self._handle_git_update(
+                p.get('base_ref', 'HEAD~1'), p.get('target_ref', 'HEAD')
+            ),
+            'scan': lambda p: self._handle_scan(),
+            'check': lambda p: self._handle_check(p['file_path']),
+            'metrics': lambda p: self._handle_metrics(),
+            'health': lambda p: self._handle_health(),
+            'set_repo': lambda p: self._handle_set_repo(p['repo_path']),
+            'vulnerabilities': lambda p: self._handle_vulnerabilities(p.get('severity')),
+            'clear': lambda p: self._handle_clear(p.get('confirm', False)),
+            'optimize': lambda p: self._handle_optimize(),
+            'claude_info': lambda p: self._handle_claude_info()
         }
         
         logger.info("claude Security Daemon initialized")
     
     def start(self):
-        """Start the claude daemon server"""
+        """Start the claude daemon server; returns after stop() or a signal"""
         try:
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_socket.bind((self.host, self.port))
-            self.server_socket.listen(10)
-            self.running = True
-            
-            logger.info(f"🔒 claude Security Daemon started on {self.host}:{self.port}")
-            logger.info("claude is ready for enterprise security analysis")
-            
-            # Start background monitoring
-            monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
-            monitor_thread.start()
-            
-            # Accept connections
-            while self.running:
-                try:
-                    client_socket, address = self.server_socket.accept()
-                    client_thread = threading.Thread(
-                        target=self._handle_client,
-                        args=(client_socket, address),
-                        daemon=True
-                    )
-                    client_thread.start()
-                except socket.error:
-                    if self.running:
-                        logger.error("Socket error in claude accept loop")
-                        
+            asyncio.run(self._serve())
         except Exception as e:
-            logger.error(f"Failed to start claude daemon: {e}")
+            logger.error("Failed to start claude daemon: %s", e)
             sys.exit(1)
+        finally:
+            self._shutdown()
     
-    def _handle_client(self, client_socket: socket.socket, address: tuple):
+    async def _serve(self):
+        """Accept clients on the event loop until stop() is called"""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        
+        # The loop wakes on signals through its own self-pipe, so shutdown
+        # runs here rather than inside a handler interrupting the loop
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self._loop.add_signal_handler(signum, self._on_signal)
+            except NotImplementedError:
+                signal.signal(signum, lambda signum, frame: self._on_signal())
+            except RuntimeError:
+                pass  # Not the main thread; the embedding program owns signals
+        
+        server = await asyncio.start_server(
+            self._handle_client, self.host, self.port, backlog=1024
+        )
+        self.running = True
+        
+        logger.info("🔒 claude Security Daemon started on %s:%d", self.host, self.port)
+        logger.info("claude is ready for enterprise security analysis")
+        
+        # Start background monitoring
+        monitor_task = asyncio.create_task(self._monitor_loop())
+        try:
+            await self._stop_event.wait()
+        finally:
+            # The monitor returns as soon as the event is set; awaiting it
+            # means it never logs after the cache has closed
+            self._stop_event.set()
+            server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await server.wait_closed()
+            await monitor_task
+    
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
         """Handle client connection"""
+        self._writers.add(writer)
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            # Small replies go out at once, and dead peers are noticed
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
         try:
-            # Receive command
-            data = client_socket.recv(4096).decode('utf-8')
-            if not data:
+            # Receive command: one length-prefixed JSON request
+            try:
+                header = await reader.readexactly(FRAME_HEADER_SIZE)
+                length = int.from_bytes(header, 'big')
+                if length > MAX_FRAME_SIZE:
+                    raise ValueError(f'Frame too large: {length} bytes')
+                data = await reader.readexactly(length)
+            except asyncio.IncompleteReadError:
                 return
             
             try:
-                request = json.loads(data)
+                # orjson's decode error subclasses json.JSONDecodeError
+                request = _loads(data)
                 command = request.get('command')
-                params = request.get('params', {})
+                handler = self.handlers.get(command) if isinstance(command, str) else None
                 
-                if command in self.handlers:
-                    response = self.handlers[command](**params)
+                if handler is not None:
+                    # Handlers run SQLite and file I/O, so they go to the
+                    # bounded worker pool and the loop keeps serving other clients
+                    response = await self._loop.run_in_executor(
+                        self._pool, handler, request.get('params') or {}
+                    )
                 else:
                     response = {'error': f'Unknown claude command: {command}'}
                 
@@ -120,23 +350,42 @@ class claudeSecurityDaemon:
             except json.JSONDecodeError:
                 response = {'error': 'Invalid JSON request'}
                 self.stats['errors'] += 1
+            except KeyError as e:
+                response = {'error': f'Missing parameter: {e}'}
+                self.stats['errors'] += 1
             except Exception as e:
                 response = {'error': str(e)}
                 self.stats['errors'] += 1
-                logger.error(f"claude error handling command: {e}")
+                logger.error("claude error handling command: %s", e)
             
             # Send response
-            response_data = json.dumps(response).encode('utf-8')
-            client_socket.sendall(response_data)
+            response_data = _dumps(response)
+            writer.writelines([len(response_data).to_bytes(FRAME_HEADER_SIZE, 'big'), response_data])
+            await writer.drain()
             
+        except ValueError as e:
+            logger.error("claude request rejected: %s", e)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
         except Exception as e:
-            logger.error(f"claude client handling error: {e}")
+            logger.error("claude client handling error: %s", e)
         finally:
-            client_socket.close()
+            self._writers.discard(writer)
+            writer.close()
+    
+    def _cached_metrics(self) -> Dict[str, Any]:
+        """The cache's performance metrics, recomputed at most every METRICS_TTL seconds"""
+        with self._metrics_lock:
+            timestamp, metrics = self._metrics_cache
+            now = time.monotonic()
+            if metrics is None or now - timestamp >= METRICS_TTL:
+                metrics = self.cache.get_performance_metrics()
+                self._metrics_cache = (now, metrics)
+            return metrics
     
     def _handle_cache(self, file_path: str, force: bool = False) -> Dict[str, Any]:
         """Handle cache command"""
-        start_time = time.time()
+        start_time = time.monotonic()
         
         entry = self.cache.cache_file_enhanced(file_path, force)
         
@@ -149,7 +398,7 @@ class claudeSecurityDaemon:
                 'size': entry.size,
                 'security_score': entry.security_score,
                 'vulnerabilities': len(entry.vulnerabilities),
-                'response_time_ms': (time.time() - start_time) * 1000,
+                'response_time_ms': (time.monotonic() - start_time) * 1000,
                 'processed_by': 'claude Security Cache v3.0'
             }
         else:
@@ -162,10 +411,10 @@ class claudeSecurityDaemon:
     
     def _handle_warm(self, patterns: List[str]) -> Dict[str, Any]:
         """Handle warm cache command"""
-        start_time = time.time()
+        start_time = time.monotonic()
         
         result = self.cache.warm_cache_parallel(patterns)
-        result['response_time_ms'] = (time.time() - start_time) * 1000
+        result['response_time_ms'] = (time.monotonic() - start_time) * 1000
         result['claude_analysis'] = True
         
         self.stats['vulnerabilities_detected'] += result.get('vulnerabilities_detected', 0)
@@ -174,7 +423,7 @@ class claudeSecurityDaemon:
     
     def _handle_get(self, file_path: str) -> Dict[str, Any]:
         """Handle get cached content command"""
-        start_time = time.time()
+        start_time = time.monotonic()
         
         content = self.cache.get_cached_content(file_path)
         
@@ -184,8 +433,8 @@ class claudeSecurityDaemon:
                 'found': True,
                 'file': file_path,
                 'size': len(content),
-                'content': content.decode('utf-8', errors='ignore')[:1000],  # First 1000 chars
-                'response_time_ms': (time.time() - start_time) * 1000,
+                'content': _preview_text(content, GET_PREVIEW_CHARS),
+                'response_time_ms': (time.monotonic() - start_time) * 1000,
                 'claude_cached': True
             }
         else:
@@ -197,17 +446,17 @@ class claudeSecurityDaemon:
     
     def _handle_stats(self) -> Dict[str, Any]:
         """Handle stats command"""
-        metrics = self.cache.get_performance_metrics()
+        metrics = dict(self._cached_metrics())
         
         # Add daemon stats
-        uptime = time.time() - self.stats['start_time']
+        uptime = time.monotonic() - self.stats['start_time']
         metrics.update({
             'daemon_uptime_seconds': uptime,
             'daemon_requests_handled': self.stats['requests_handled'],
             'daemon_errors': self.stats['errors'],
             'daemon_requests_per_second': self.stats['requests_handled'] / uptime if uptime > 0 else 0,
             'total_vulnerabilities_detected': self.stats['vulnerabilities_detected'],
-            'daemon_type': 'claude Security Daemon v3.0'
+            'daemon_type': DAEMON_TYPE
         })
         
         return metrics
@@ -263,13 +512,13 @@ class claudeSecurityDaemon:
     
     def _handle_metrics(self) -> Dict[str, Any]:
         """Handle detailed metrics command"""
-        return self.cache.get_performance_metrics()
+        return self._cached_metrics()
     
     def _handle_health(self) -> Dict[str, Any]:
         """Handle claude health check command"""
         try:
             # Check cache system
-            metrics = self.cache.get_performance_metrics()
+            metrics = self._cached_metrics()
             
             # Check system resources
             process = psutil.Process()
@@ -289,7 +538,7 @@ class claudeSecurityDaemon:
                 'cache_hit_rate': metrics.get('hit_rate_percent', 0),
                 'memory_usage_mb': memory_info.rss / 1024 / 1024,
                 'cached_files': metrics.get('cached_files', 0),
-                'daemon_uptime': time.time() - self.stats['start_time'],
+                'daemon_uptime': time.monotonic() - self.stats['start_time'],
                 'database_healthy': db_healthy,
                 'partitions': len(self.cache.partitions),
                 'git_integration': self.cache.git_integration is not None,
@@ -322,22 +571,19 @@ class claudeSecurityDaemon:
     
     def _handle_vulnerabilities(self, severity: Optional[str] = None) -> Dict[str, Any]:
         """Handle get vulnerabilities command"""
+        filtered = bool(severity)
+        args = (severity,) if filtered else ()
+        
         with self.cache._get_db_connection() as conn:
-            if severity:
-                cursor = conn.execute(
-                    'SELECT * FROM claude_vulnerabilities WHERE severity = ? AND resolved = 0',
-                    (severity,)
-                )
-            else:
-                cursor = conn.execute(
-                    'SELECT * FROM claude_vulnerabilities WHERE resolved = 0'
-                )
+            count = conn.execute(VULNERABILITY_COUNT_SQL[filtered], args).fetchone()[0]
             
-            vulnerabilities = [dict(row) for row in cursor.fetchall()]
+            # SQLite stops at the response cap rather than producing every row
+            cursor = conn.execute(VULNERABILITY_ROWS_SQL[filtered], args)
+            vulnerabilities = [dict(row) for row in cursor.fetchmany(VULNERABILITIES_LIMIT)]
             
         return {
-            'count': len(vulnerabilities),
-            'vulnerabilities': vulnerabilities[:100],  # Limit to 100 for response size
+            'count': count,
+            'vulnerabilities': vulnerabilities,
             'analyzed_by': 'claude Security Analyzer'
         }
     
@@ -348,17 +594,11 @@ class claudeSecurityDaemon:
         
         try:
             # Clear all partitions
-            for partition in self.cache.partitions.values():
-                with self.cache._get_db_connection(partition.partition_id) as conn:
-                    conn.execute('DELETE FROM claude_partition_cache')
-                    conn.commit()
+            self._map_partitions(_clear_partition)
             
             # Clear main index
             with self.cache._get_db_connection() as conn:
-                conn.execute('DELETE FROM claude_cache')
-                conn.execute('DELETE FROM claude_vulnerabilities')
-                conn.execute('DELETE FROM claude_git_commits')
-                conn.commit()
+                conn.executescript(CLEAR_INDEX_SCRIPT)
             
             # Clear memory caches
             self.cache._memory_cache.clear()
@@ -373,25 +613,36 @@ class claudeSecurityDaemon:
         except Exception as e:
             return {'status': 'error', 'error': str(e)}
     
+    def _map_partitions(self, func: Callable[[Path], Any]) -> Dict[str, Any]:
+        """Call func on every partition's database file side by side
+        
+        Partitions are separate files, so each gets its own connection and
+        thread; returns func's result per partition ID.
+        """
+        partitions = list(self.cache.partitions.values())
+        with ThreadPoolExecutor(max_workers=max(1, min(PARTITION_WORKERS, len(partitions)))) as executor:
+            results = executor.map(func, [p.db_file for p in partitions])
+            return {p.partition_id: result for p, result in zip(partitions, results)}
+    
     def _handle_optimize(self) -> Dict[str, Any]:
         """Handle optimize command"""
         try:
-            # Run VACUUM on all databases
-            for partition in self.cache.partitions.values():
-                with self.cache._get_db_connection(partition.partition_id) as conn:
-                    conn.execute('VACUUM')
+            # Partitions are vacuumed incrementally; only the main index is rebuilt
+            partition_seconds = self._map_partitions(_vacuum_partition)
             
             with self.cache._get_db_connection() as conn:
                 conn.execute('VACUUM')
                 conn.execute('ANALYZE')
             
-            # Force garbage collection
-            import gc
-            gc.collect()
+            # Only force garbage collection under memory pressure
+            if psutil.Process().memory_info().rss > self._gc_threshold:
+                gc.collect()
+                self._gc_threshold = max(self._gc_threshold, int(psutil.Process().memory_info().rss * 1.5))
             
             return {
                 'status': 'success', 
                 'message': 'claude optimization completed',
+                'partition_seconds': partition_seconds,
                 'claude_optimized': True
             }
             
@@ -401,43 +652,54 @@ class claudeSecurityDaemon:
     def _handle_claude_info(self) -> Dict[str, Any]:
         """Handle claude info command"""
         return {
-            'name': 'claude Security Cache System',
-            'version': '3.0',
-            'description': 'Advanced security analysis for enterprise codebases',
-            'features': [
-                'Real-time vulnerability detection',
-                'Git-based incremental updates',
-                'Intelligent cache partitioning',
-                'Security-focused warming strategies',
-                'Comprehensive security reporting'
-            ],
+            **CLAUDE_INFO,
             'daemon_port': self.port,
-            'daemon_uptime': time.time() - self.stats['start_time'],
-            'enterprise_ready': True,
-            'security_patterns': len(self.cache.security_analyzer.patterns)
+            'daemon_uptime': time.monotonic() - self.stats['start_time'],
+            'security_patterns': self._security_pattern_count
         }
     
-    def _monitor_loop(self):
+    async def _monitor_loop(self):
         """Background monitoring loop"""
-        while self.running:
+        while True:
+            # Log metrics every MONITOR_INTERVAL seconds, until stop()
             try:
-                # Log metrics every 60 seconds
-                time.sleep(60)
-                metrics = self.cache.get_performance_metrics()
-                logger.info(f"claude metrics: Hit rate: {metrics['hit_rate_percent']:.1f}%, "
-                          f"Files: {metrics['cached_files']}, "
-                          f"Memory: {metrics['memory_usage_mb']:.1f}MB, "
-                          f"Security Score: {metrics['avg_security_score']:.1f}, "
-                          f"Vulnerabilities: {metrics['active_vulnerabilities']}")
+                await asyncio.wait_for(self._stop_event.wait(), MONITOR_INTERVAL)
+                return
+            except asyncio.TimeoutError:
+                pass
+            
+            try:
+                metrics = await self._loop.run_in_executor(self._pool, self._cached_metrics)
+                logger.info("claude metrics: Hit rate: %.1f%%, Files: %d, Memory: %.1fMB, "
+                            "Security Score: %.1f, Vulnerabilities: %d",
+                            metrics['hit_rate_percent'], metrics['cached_files'],
+                            metrics['memory_usage_mb'], metrics['avg_security_score'],
+                            metrics['active_vulnerabilities'])
                 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                logger.error(f"claude monitor loop error: {e}")
+                logger.error("claude monitor loop error: %s", e)
+    
+    def _on_signal(self):
+        """SIGINT/SIGTERM handler"""
+        logger.info("Received signal, shutting down claude daemon...")
+        self.stop()
     
     def stop(self):
-        """Stop the claude daemon"""
+        """Stop the claude daemon; safe to call from any thread"""
         self.running = False
-        if self.server_socket:
-            self.server_socket.close()
+        if self._loop is not None and self._stop_event is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._stop_event.set)
+            except RuntimeError:
+                pass  # Event loop already closed
+    
+    def _shutdown(self):
+        """Release resources once the event loop has exited"""
+        # Queued requests are dropped; running ones finish before the
+        # cache closes their connections
+        self._pool.shutdown(wait=True, cancel_futures=True)
         
         # Cleanup cache resources
         self.cache.cleanup()
@@ -457,6 +719,7 @@ class claudeDaemonClient:
         try:
             client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             client_socket.settimeout(30)  # 30 second timeout
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             client_socket.connect((self.host, self.port))
             
             request = {
@@ -465,19 +728,15 @@ class claudeDaemonClient:
                 'client': 'claude CLI'
             }
             
-            client_socket.sendall(json.dumps(request).encode('utf-8'))
+            _send_framed(client_socket, _dumps(request))
             
             # Receive response
-            response_data = b''
-            while True:
-                chunk = client_socket.recv(4096)
-                if not chunk:
-                    break
-                response_data += chunk
-            
+            response_data = _recv_framed(client_socket)
             client_socket.close()
+            if response_data is None:
+                raise ConnectionError('claude daemon closed the connection without replying')
             
-            return json.loads(response_data.decode('utf-8'))
+            return _loads(response_data)
             
         except Exception as e:
             return {'error': f'Failed to communicate with claude daemon: {e}'}
@@ -536,15 +795,7 @@ def main():
         # Run as daemon
         daemon = claudeSecurityDaemon(args.host, args.port)
         
-        # Handle signals
-        def signal_handler(signum, frame):
-            logger.info("Received signal, shutting down claude daemon...")
-            daemon.stop()
-            sys.exit(0)
-        
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
-        
+        # Serves until SIGINT/SIGTERM
         daemon.start()
         
     elif args.command:
@@ -582,7 +833,7 @@ def main():
         else:
             result = {'error': f'Unknown claude command: {args.command}'}
         
-        print(json.dumps(result, indent=2))
+        print(_dumps(result, indent=True).decode('utf-8'))
         
     else:
         print("🔒 claude Security Cache System v3.0")
@@ -6,33 +6,141 @@ Provides Claude Code compatibility while maintaining claude branding
 
 import json
 import asyncio
+import base64
 import sys
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 from pathlib import Path
 import logging
 
+try:
+    import orjson  # Rust-backed JSON, encodes straight to bytes
+except ImportError:
+    orjson = None
+
 # Import claude cache system
 from claude_security_cache import claudeSecurityCache
 
 logger = logging.getLogger("claudeMCP")
 
+# Longest request line accepted on stdin
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+# Requests being processed or waiting for their response to be written;
+# reading stdin pauses at this many
+MAX_IN_FLIGHT = 32
+
+# Tools that change the cache. A call to one of these starts only after
+# every earlier request has finished, and later requests wait for it
+MUTATING_TOOLS = frozenset({"claude_cache_file", "claude_warm_cache"})
+
+# tools/list response; it never changes, so it is built and encoded once
+TOOLS_LIST = {
+    "tools": [
+        {
+            "name": "claude_cache_file",
+            "description": "Cache a file with claude security analysis",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "file_path": {"type": "string", "description": "Path to file to cache"},
+                    "force": {"type": "boolean", "description": "Force recache", "default": False}
+                },
+                "required": ["file_path"]
+            }
+        },
+        {
+            "name": "claude_warm_cache",
+            "description": "Warm cache with security analysis for multiple files",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "patterns": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "File patterns to cache"
+                    }
+                },
+                "required": ["patterns"]
+            }
+        },
+        {
+            "name": "claude_get_content",
+            "description": "Get cached file content",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "file_path": {"type": "string", "description": "Path to cached file"}
+                },
+                "required": ["file_path"]
+            }
+        },
+        {
+            "name": "claude_security_report",
+            "description": "Generate comprehensive security report",
+            "inputSchema": {
+                "type": "object",
+                "properties": {}
+            }
+        },
+        {
+            "name": "claude_health_check",
+            "description": "Check claude cache system health",
+            "inputSchema": {
+                "type": "object",
+                "properties": {}
+            }
+        }
+    ]
+}
+
+
+def _dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize a message or tool result to UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode('utf-8')
+
+
+def _loads(data: Union[bytes, str]) -> Any:
+    """Parse a message; surrounding whitespace is ignored"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _as_text(content: bytes) -> Optional[str]:
+    """Decode file content as UTF-8 text; None for binary content"""
+    if b'\x00' in content:
+        return None
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+
 class claudeMCPServer:
     """MCP Server for claude Security Cache - Claude Code Integration"""
     
     def __init__(self):
         self.cache = claudeSecurityCache()
         self.tools = {
-            "cache_file": self._cache_file_tool,
-            "warm_cache": self._warm_cache_tool,
-            "get_cached_content": self._get_cached_content_tool,
-            "security_report": self._security_report_tool,
-            "health_check": self._health_check_tool
+            "claude_cache_file": self._cache_file_tool,
+            "claude_warm_cache": self._warm_cache_tool,
+            "claude_get_content": self._get_cached_content_tool,
+            "claude_security_report": self._security_report_tool,
+            "claude_health_check": self._health_check_tool
         }
+        
+        self._tools_list = TOOLS_LIST
+        self._tools_list_bytes = _dumps(TOOLS_LIST)
+        
+        # stdio streams, opened by run(); None where stdin/stdout is not a
+        # pipe, socket or terminal and plain blocking I/O is used instead
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
     
     async def _cache_file_tool(self, file_path: str, force: bool = False) -> Dict[str, Any]:
         """Cache a file with claude security analysis"""
         try:
-            entry = self.cache.cache_file_enhanced(file_path, force)
+            entry = await asyncio.to_thread(self.cache.cache_file_enhanced, file_path, force)
             if entry:
                 return {
                     "success": True,
@@ -59,7 +167,7 @@ class claudeMCPServer:
     async def _warm_cache_tool(self, patterns: List[str]) -> Dict[str, Any]:
         """Warm cache with security analysis"""
         try:
-            result = self.cache.warm_cache_parallel(patterns)
+            result = await asyncio.to_thread(self.cache.warm_cache_parallel, patterns)
             result["claude_analysis"] = True
             return result
         except Exception as e:
@@ -71,15 +179,22 @@ class claudeMCPServer:
     async def _get_cached_content_tool(self, file_path: str) -> Dict[str, Any]:
         """Get cached file content"""
         try:
-            content = self.cache.get_cached_content(file_path)
+            content = await asyncio.to_thread(self.cache.get_cached_content, file_path)
             if content:
-                return {
+                result = {
                     "success": True,
                     "file": file_path,
-                    "content": content.decode('utf-8', errors='ignore'),
                     "size": len(content),
                     "claude_cached": True
                 }
+                text = _as_text(content)
+                if text is not None:
+                    result["content"] = text
+                else:
+                    # Binary files are sent intact rather than with the
+                    # undecodable bytes dropped
+                    result["content_base64"] = base64.b64encode(content).decode('ascii')
+                return result
             else:
                 return {
                     "success": False,
@@ -96,7 +211,7 @@ class claudeMCPServer:
     async def _security_report_tool(self) -> Dict[str, Any]:
         """Generate claude security report"""
         try:
-            report = self.cache.get_security_report()
+            report = await asyncio.to_thread(self.cache.get_security_report)
             report["claude_generated"] = True
             return report
         except Exception as e:
@@ -108,7 +223,7 @@ class claudeMCPServer:
     async def _health_check_tool(self) -> Dict[str, Any]:
         """Check claude cache health"""
         try:
-            metrics = self.cache.get_performance_metrics()
+            metrics = await asyncio.to_thread(self.cache.get_performance_metrics)
             return {
                 "status": "healthy",
                 "claude_version": "3.0",
@@ -127,87 +242,28 @@ class claudeMCPServer:
         params = request.get("params", {})
         
         if method == "tools/list":
-            return {
-                "tools": [
-                    {
-                        "name": "claude_cache_file",
-                        "description": "Cache a file with claude security analysis",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "file_path": {"type": "string", "description": "Path to file to cache"},
-                                "force": {"type": "boolean", "description": "Force recache", "default": False}
-                            },
-                            "required": ["file_path"]
-                        }
-                    },
-                    {
-                        "name": "claude_warm_cache",
-                        "description": "Warm cache with security analysis for multiple files",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "patterns": {
-                                    "type": "array",
-                                    "items": {"type": "string"},
-                                    "description": "File patterns to cache"
-                                }
-                            },
-                            "required": ["patterns"]
-                        }
-                    },
-                    {
-                        "name": "claude_get_content",
-                        "description": "Get cached file content",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "file_path": {"type": "string", "description": "Path to cached file"}
-                            },
-                            "required": ["file_path"]
-                        }
-                    },
-                    {
-                        "name": "claude_security_report",
-                        "description": "Generate comprehensive security report",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {}
-                        }
-                    },
-                    {
-                        "name": "claude_health_check",
-                        "description": "Check claude cache system health",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {}
-                        }
-                    }
-                ]
-            }
+            return self._tools_list
         
         elif method == "tools/call":
             tool_name = params.get("name")
             arguments = params.get("arguments", {})
             
-            if tool_name == "claude_cache_file":
-                result = await self._cache_file_tool(**arguments)
-            elif tool_name == "claude_warm_cache":
-                result = await self._warm_cache_tool(**arguments)
-            elif tool_name == "claude_get_content":
-                result = await self._get_cached_content_tool(**arguments)
-            elif tool_name == "claude_security_report":
-                result = await self._security_report_tool()
-            elif tool_name == "claude_health_check":
-                result = await self._health_check_tool()
-            else:
+            handler = self.tools.get(tool_name)
+            if handler is None:
                 result = {"error": f"Unknown claude tool: {tool_name}"}
+            else:
+                try:
+                    result = await handler(**arguments)
+                except Exception as e:
+                    # Tools report their own failures; this catches calls
+                    # that don't match the tool's signature
+                    result = {"error": str(e)}
             
             return {
                 "content": [
                     {
                         "type": "text",
-                        "text": json.dumps(result, indent=2)
+                        "text": _dumps(result, indent=True).decode('utf-8')
                     }
                 ]
             }
@@ -218,27 +274,118 @@ class claudeMCPServer:
     async def run(self):
         """Run the MCP server"""
         logger.info("Starting claude MCP Server for Claude Code integration")
+        await self._open_stdio()
         
         # Read messages from stdin and write responses to stdout
-        # This follows the MCP protocol for Claude Code integration
+        # This follows the MCP protocol for Claude Code integration.
+        # Requests are processed concurrently, so a slow tool doesn't hold
+        # up the ones behind it; responses carry no request ID, so they are
+        # still written in request order
+        loop = asyncio.get_running_loop()
+        in_flight = asyncio.Semaphore(MAX_IN_FLIGHT)
+        pending: asyncio.Queue = asyncio.Queue()
+        writer_task = asyncio.create_task(self._write_responses(pending, in_flight))
+        # Last cache-changing request, and the requests started since it
+        barrier: Optional[asyncio.Task] = None
+        since_barrier: List[asyncio.Task] = []
+        try:
+            while True:
+                try:
+                    line = await self._read_line()
+                    if not line:
+                        break
+                    request = _loads(line)
+                    mutating = self._is_mutating(request)
+                except Exception as e:
+                    logger.error(f"Error handling request: {e}")
+                    response = loop.create_future()
+                    response.set_result({"error": str(e)})
+                else:
+                    if mutating:
+                        after = since_barrier + [barrier] if barrier else since_barrier
+                        response = asyncio.create_task(self._process(request, after))
+                        barrier, since_barrier = response, []
+                    else:
+                        response = asyncio.create_task(self._process(request, [barrier] if barrier else []))
+                        since_barrier = [task for task in since_barrier if not task.done()]
+                        since_barrier.append(response)
+                await in_flight.acquire()
+                pending.put_nowait(response)
+        finally:
+            pending.put_nowait(None)
+            await writer_task
+            if self._writer is not None:
+                # Wait for the transport to hand every buffered response to
+                # stdout before the loop goes away
+                self._writer.transport.set_write_buffer_limits(0)
+                await self._writer.drain()
+                self._writer.close()
+    
+    @staticmethod
+    def _is_mutating(request: Dict[str, Any]) -> bool:
+        """Whether the request calls a tool that changes the cache"""
+        if request.get("method") != "tools/call":
+            return False
+        params = request.get("params", {})
+        return isinstance(params, dict) and params.get("name") in MUTATING_TOOLS
+    
+    async def _process(self, request: Dict[str, Any], after: List[asyncio.Task]) -> Union[Dict[str, Any], bytes]:
+        """Handle one request once the requests it must follow are done;
+        errors become error responses"""
+        if after:
+            await asyncio.wait(after)
+        try:
+            if request.get("method") == "tools/list":
+                return self._tools_list_bytes
+            return await self.handle_request(request)
+        except Exception as e:
+            logger.error(f"Error handling request: {e}")
+            return {"error": str(e)}
+    
+    async def _write_responses(self, pending: asyncio.Queue, in_flight: asyncio.Semaphore):
+        """Write each request's response, in the order the requests came in"""
         while True:
+            response = await pending.get()
+            if response is None:
+                return
             try:
-                line = await asyncio.get_event_loop().run_in_executor(None, sys.stdin.readline)
-                if not line:
-                    break
-                
-                request = json.loads(line.strip())
-                response = await self.handle_request(request)
-                
-                # Send response
-                print(json.dumps(response), flush=True)
-                
-            except EOFError:
-                break
-            except Exception as e:
-                logger.error(f"Error handling request: {e}")
-                error_response = {"error": str(e)}
-                print(json.dumps(error_response), flush=True)
+                await self._write_message(await response)
+            finally:
+                in_flight.release()
+    
+    async def _open_stdio(self):
+        """Attach stdin and stdout to the event loop"""
+        loop = asyncio.get_running_loop()
+        try:
+            reader = asyncio.StreamReader(limit=MAX_MESSAGE_SIZE)
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+            self._reader = reader
+        except (ValueError, OSError) as e:
+            logger.debug(f"stdin is read in a worker thread: {e}")
+        
+        try:
+            sys.stdout.flush()
+            transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, sys.stdout)
+            self._writer = asyncio.StreamWriter(transport, protocol, None, loop)
+        except (ValueError, OSError) as e:
+            logger.debug(f"stdout is written synchronously: {e}")
+    
+    async def _read_line(self) -> bytes:
+        """Read one request line from stdin; empty at EOF"""
+        if self._reader is not None:
+            return await self._reader.readline()
+        return await asyncio.get_running_loop().run_in_executor(None, sys.stdin.buffer.readline)
+    
+    async def _write_message(self, message: Union[Dict[str, Any], bytes]):
+        """Write one newline-terminated JSON message to stdout"""
+        data = (message if isinstance(message, bytes) else _dumps(message)) + b"\n"
+        if self._writer is not None:
+            self._writer.write(data)
+            # Waits only while the client is not keeping up with responses
+            await self._writer.drain()
+        else:
+            sys.stdout.buffer.write(data)
+            sys.stdout.buffer.flush()
 
 def main():
     """Main entry point for claude MCP Server"""
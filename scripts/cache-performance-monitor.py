@@ -9,12 +9,149 @@ import sys
 import time
 import json
 import sqlite3
+import bisect
+import functools
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, fields
 import argparse
 
+try:
+    import orjson  # Rust-backed JSON, encodes straight to bytes
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np  # Vectorized means over the metrics history
+except ImportError:
+    np = None
+
+
+def _dumps(obj, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode('utf-8')
+
+
+def _loads(data: bytes):
+    """Parse UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _mean(values) -> float:
+    """Arithmetic mean of a non-empty sequence"""
+    if np is not None:
+        return float(np.mean(values))
+    return sum(values) / len(values)
+
+# Cache statistics in one pass over the index:
+# file count, total size, total accesses, mean accesses of files read at least once
+CACHE_STATS_SQL = (
+    'SELECT COUNT(*), SUM(size), SUM(access_count), '
+    'AVG(CASE WHEN access_count > 0 THEN access_count END) FROM cache_entries'
+)
+
+# Metrics history entries kept
+METRICS_HISTORY_MAX = 1000
+
+# Size at which the append-only metrics file is cut back to the last
+# METRICS_HISTORY_MAX entries (an entry is about 150 bytes)
+METRICS_FILE_MAX_BYTES = 512 * 1024
+
+# Threads walking the cache's top-level directories for the disk usage probe
+SIZE_WALK_WORKERS = 8
+
+# Seconds the disk usage and response time probes are reused for
+PROBE_TTL = 30
+RESPONSE_PROBE_TTL = 60
+
+# Timed reads per response time probe, after one untimed warm-up read;
+# the median is reported
+RESPONSE_SAMPLES = 7
+
+# ANSI escape: clear the screen and move the cursor home
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+
+
+def _ttl_cached(ttl: float):
+    """Memoize a no-argument method per instance for ``ttl`` seconds"""
+    def decorator(func):
+        name = func.__name__
+        
+        @functools.wraps(func)
+        def wrapper(self):
+            now = time.monotonic()
+            cached = self._probe_cache.get(name)
+            if cached is not None and now - cached[0] < ttl:
+                return cached[1]
+            value = func(self)
+            self._probe_cache[name] = (now, value)
+            return value
+        
+        return wrapper
+    return decorator
+
+
+def _median_seconds(func) -> float:
+    """Median run time of ``func`` over RESPONSE_SAMPLES calls, in seconds"""
+    samples = []
+    for _ in range(RESPONSE_SAMPLES):
+        start = time.perf_counter_ns()
+        func()
+        samples.append(time.perf_counter_ns() - start)
+    samples.sort()
+    return samples[len(samples) // 2] / 1e9
+
+
+def _tree_size(root: str) -> int:
+    """Total size of the regular files under ``root``; symlinks are not followed"""
+    total = 0
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue  # Removed while walking
+        except OSError:
+            continue
+    return total
+
+
+def _cache_dir_size(root: str) -> int:
+    """Total size of the regular files under ``root``, walking each top-level
+    directory in its own thread so the per-file stat calls overlap"""
+    total = 0
+    subdirs = []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+    
+    if len(subdirs) > 1:
+        with ThreadPoolExecutor(max_workers=min(SIZE_WALK_WORKERS, len(subdirs))) as executor:
+            total += sum(executor.map(_tree_size, subdirs))
+    elif subdirs:
+        total += _tree_size(subdirs[0])
+    return total
+
 @dataclass
 class PerformanceMetrics:
     """Performance metrics for cache analysis"""
@@ -26,20 +163,103 @@ class PerformanceMetrics:
     memory_usage: int
     effectiveness_score: float
 
+class MetricsHistory:
+    """Performance metrics history stored column-wise, one array per
+    PerformanceMetrics field, so the report scans only the fields it uses.
+    Entries are kept in recording order, oldest first, up to ``maxlen``."""
+    
+    def __init__(self, metrics: Iterable[PerformanceMetrics] = (), maxlen: int = METRICS_HISTORY_MAX):
+        self.maxlen = maxlen
+        if np is not None:
+            # Twice the window, so the live entries only move when the end is
+            # reached; they are columns[name][_lo:_hi]
+            self._columns = {
+                field.name: np.empty(2 * maxlen, dtype=np.int64 if field.type is int else np.float64)
+                for field in fields(PerformanceMetrics)
+            }
+        else:
+            self._columns = {field.name: [] for field in fields(PerformanceMetrics)}
+        self._lo = self._hi = 0
+        
+        for metric in metrics:
+            self.append(metric)
+    
+    def __len__(self) -> int:
+        return self._hi - self._lo
+    
+    def __getitem__(self, index: int) -> PerformanceMetrics:
+        """Entry ``index`` as a PerformanceMetrics, for row-wise callers"""
+        values = {name: self.column(name)[index] for name in self._columns}
+        if np is not None:
+            values = {name: value.item() for name, value in values.items()}
+        return PerformanceMetrics(**values)
+    
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+    
+    def append(self, metric: PerformanceMetrics):
+        """Add the newest entry, dropping the oldest beyond ``maxlen``"""
+        if np is not None and self._hi == 2 * self.maxlen:
+            count = self._hi - self._lo
+            for column in self._columns.values():
+                column[:count] = column[self._lo:self._hi]
+            self._lo, self._hi = 0, count
+        
+        for name, column in self._columns.items():
+            if np is not None:
+                column[self._hi] = getattr(metric, name)
+            else:
+                column.append(getattr(metric, name))
+        self._hi += 1
+        
+        if self._hi - self._lo > self.maxlen:
+            if np is not None:
+                self._lo += 1
+            else:
+                for column in self._columns.values():
+                    del column[0]
+                self._hi -= 1
+    
+    def column(self, name: str, start: int = 0):
+        """Values of one field from entry ``start`` on; a view with NumPy"""
+        if np is not None:
+            return self._columns[name][self._lo + start:self._hi]
+        return self._columns[name][start:]
+    
+    def index_at(self, timestamp: float) -> int:
+        """Index of the first entry recorded at or after ``timestamp``"""
+        timestamps = self.column('timestamp')
+        if np is not None:
+            return int(np.searchsorted(timestamps, timestamp, side='left'))
+        return bisect.bisect_left(timestamps, timestamp)
+
 class CachePerformanceMonitor:
     """Monitor and analyze cache performance"""
     
     def __init__(self, cache_dir: str = None):
         self.cache_dir = Path(cache_dir or os.path.expanduser("~/.claude/cache"))
         self.db_file = self.cache_dir / "files" / "index.db"
-        self.metrics_file = self.cache_dir / "performance_metrics.json"
+        self.metrics_file = self.cache_dir / "performance_metrics.jsonl"
+        self.legacy_metrics_file = self.cache_dir / "performance_metrics.json"
         self.config_file = self.cache_dir / "config" / "cache.json"
         
-        # Load configuration
-        self.config = self._load_config()
+        # Index connection, opened on first use and kept for the dashboard's
+        # repeated collections
+        self._conn: Optional[sqlite3.Connection] = None
         
-        # Performance tracking
-        self.metrics_history = self._load_metrics_history()
+        # Results of the expensive probes, by method name: (time, value)
+        self._probe_cache: Dict[str, Tuple[float, float]] = {}
+    
+    @functools.cached_property
+    def config(self) -> Dict:
+        """Cache configuration, loaded on first use"""
+        return self._load_config()
+    
+    @functools.cached_property
+    def metrics_history(self) -> MetricsHistory:
+        """Performance tracking history, loaded on first use"""
+        return self._load_metrics_history()
     
     def _load_config(self) -> Dict:
         """Load cache configuration"""
@@ -49,20 +269,53 @@ class CachePerformanceMonitor:
         except (FileNotFoundError, json.JSONDecodeError):
             return {}
     
-    def _load_metrics_history(self) -> List[PerformanceMetrics]:
+    def _load_metrics_history(self) -> MetricsHistory:
         """Load historical performance metrics"""
         try:
-            with open(self.metrics_file, 'r') as f:
-                data = json.load(f)
-                return [PerformanceMetrics(**item) for item in data]
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+            with open(self.metrics_file, 'rb') as f:
+                lines = deque(f, maxlen=METRICS_HISTORY_MAX)
+        except FileNotFoundError:
+            return self._migrate_legacy_history()
+        
+        history = MetricsHistory()
+        for line in lines:
+            try:
+                history.append(PerformanceMetrics(**_loads(line)))
+            except (json.JSONDecodeError, TypeError):
+                continue  # Blank or partially written line
+        return history
+    
+    def _migrate_legacy_history(self) -> MetricsHistory:
+        """Load the history from the old single JSON document and convert
+        it to the append-only format"""
+        try:
+            with open(self.legacy_metrics_file, 'rb') as f:
+                data = _loads(f.read())
+            history = [PerformanceMetrics(**item) for item in data][-METRICS_HISTORY_MAX:]
+        except (FileNotFoundError, json.JSONDecodeError, TypeError):
+            return MetricsHistory()
+        
+        self._rewrite_metrics_file(_dumps(vars(metric)) + b"\n" for metric in history)
+        self.legacy_metrics_file.unlink()
+        return MetricsHistory(history)
+    
+    def _append_metrics(self, metric: PerformanceMetrics):
+        """Append one entry to the metrics file"""
+        with open(self.metrics_file, 'ab') as f:
+            f.write(_dumps(vars(metric)) + b"\n")
+            size = f.tell()
+        
+        if size > METRICS_FILE_MAX_BYTES:
+            with open(self.metrics_file, 'rb') as f:
+                lines = deque(f, maxlen=METRICS_HISTORY_MAX)
+            self._rewrite_metrics_file(lines)
     
-    def _save_metrics_history(self):
-        """Save metrics history to file"""
-        data = [vars(metric) for metric in self.metrics_history]
-        with open(self.metrics_file, 'w') as f:
-            json.dump(data, f, indent=2)
+    def _rewrite_metrics_file(self, lines):
+        """Replace the metrics file with the given JSON lines"""
+        tmp_file = self.metrics_file.with_suffix('.jsonl.tmp')
+        with open(tmp_file, 'wb') as f:
+            f.writelines(lines)
+        os.replace(tmp_file, self.metrics_file)
     
     def collect_current_metrics(self) -> PerformanceMetrics:
         """Collect current performance metrics"""
@@ -80,21 +333,11 @@ class CachePerformanceMonitor:
                 effectiveness_score=0.0
             )
         
-        conn = sqlite3.connect(str(self.db_file))
-        cursor = conn.cursor()
-        
         # Get cache statistics
-        cursor.execute('SELECT COUNT(*) FROM cache_entries')
-        total_files = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT SUM(size) FROM cache_entries')
-        cache_size = cursor.fetchone()[0] or 0
-        
-        cursor.execute('SELECT SUM(access_count) FROM cache_entries')
-        total_accesses = cursor.fetchone()[0] or 0
-        
-        cursor.execute('SELECT AVG(access_count) FROM cache_entries WHERE access_count > 0')
-        avg_access = cursor.fetchone()[0] or 0
+        total_files, cache_size, total_accesses, avg_access = self._index_connection().execute(CACHE_STATS_SQL).fetchone()
+        cache_size = cache_size or 0
+        total_accesses = total_accesses or 0
+        avg_access = avg_access or 0
         
         # Calculate hit rate approximation
         hit_rate = min(1.0, avg_access / 2.0) if avg_access > 0 else 0.0
@@ -110,8 +353,6 @@ class CachePerformanceMonitor:
             hit_rate, total_files, cache_size, avg_response_time
         )
         
-        conn.close()
-        
         return PerformanceMetrics(
             timestamp=timestamp,
             hit_rate=hit_rate,
@@ -122,6 +363,7 @@ class CachePerformanceMonitor:
             effectiveness_score=effectiveness_score
         )
     
+    @_ttl_cached(RESPONSE_PROBE_TTL)
     def _estimate_response_time(self) -> float:
         """Estimate average response time"""
         # Simple benchmark with test file
@@ -130,31 +372,56 @@ class CachePerformanceMonitor:
             return 0.0
         
         try:
-            # Time file system read
-            start = time.time()
-            with open(test_file, 'r') as f:
-                f.read()
-            fs_time = time.time() - start
-            
             # Time cache read (if available)
-            sys.path.insert(0, str(self.cache_dir))
+            if str(self.cache_dir) not in sys.path:
+                sys.path.insert(0, str(self.cache_dir))
             from claude_cache import get_cache
             cache = get_cache()
             
-            start = time.time()
-            cache.get_file(str(test_file))
-            cache_time = time.time() - start
+            # The untimed warm-up read is the one access the probe records;
+            # the timed reads' access stats are put back afterwards
+            path = str(test_file)
+            cache.get_file(path)
+            with self._preserved_access_stats(path):
+                cache_time = _median_seconds(lambda: cache.get_file(path))
             
             return cache_time
             
         except Exception:
             return 0.001  # Default estimate
     
+    def _index_connection(self) -> sqlite3.Connection:
+        """Connection to the cache index, opened on first use"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(str(self.db_file), isolation_level=None, check_same_thread=False)
+        return self._conn
+    
+    @contextmanager
+    def _preserved_access_stats(self, path: str):
+        """Restore a cache entry's access count and time on exit, so reads
+        made by the monitor itself don't count towards the hit rate"""
+        saved = None
+        if self.db_file.exists():
+            try:
+                saved = self._index_connection().execute(
+                    'SELECT access_count, last_accessed FROM cache_entries WHERE path = ?', (path,)
+                ).fetchone()
+            except sqlite3.Error:
+                pass
+        try:
+            yield
+        finally:
+            if saved is not None:
+                self._index_connection().execute(
+                    'UPDATE cache_entries SET access_count = ?, last_accessed = ? WHERE path = ?',
+                    (*saved, path)
+                )
+    
+    @_ttl_cached(PROBE_TTL)
     def _estimate_memory_usage(self) -> int:
         """Estimate memory usage of cache"""
         try:
-            cache_dir_size = sum(f.stat().st_size for f in self.cache_dir.rglob('*') if f.is_file())
-            return cache_dir_size
+            return _cache_dir_size(str(self.cache_dir))
         except Exception:
             return 0
     
@@ -172,32 +439,34 @@ class CachePerformanceMonitor:
     def record_metrics(self):
         """Record current metrics"""
         current = self.collect_current_metrics()
-        self.metrics_history.append(current)
-        
-        # Keep only last 1000 entries
-        if len(self.metrics_history) > 1000:
-            self.metrics_history = self.metrics_history[-1000:]
         
-        self._save_metrics_history()
+        # Recording only appends to the file; the history is read only if
+        # it is already loaded or an old-format file has to be converted
+        if 'metrics_history' in self.__dict__:
+            self.metrics_history.append(current)  # Keeps the last METRICS_HISTORY_MAX
+        elif not self.metrics_file.exists() and self.legacy_metrics_file.exists():
+            self._migrate_legacy_history()
+        self._append_metrics(current)
     
     def get_performance_report(self, hours: int = 24) -> Dict:
         """Generate performance report for specified time period"""
         cutoff_time = time.time() - (hours * 3600)
-        recent_metrics = [m for m in self.metrics_history if m.timestamp >= cutoff_time]
+        start = self.metrics_history.index_at(cutoff_time)
+        metrics_count = len(self.metrics_history) - start
         
-        if not recent_metrics:
+        if not metrics_count:
             return {"error": "No metrics available for specified period"}
         
         # Calculate trends
-        hit_rates = [m.hit_rate for m in recent_metrics]
-        response_times = [m.avg_response_time for m in recent_metrics]
-        effectiveness_scores = [m.effectiveness_score for m in recent_metrics]
+        hit_rates = self.metrics_history.column('hit_rate', start)
+        response_times = self.metrics_history.column('avg_response_time', start)
+        effectiveness_scores = self.metrics_history.column('effectiveness_score', start)
         
-        current = recent_metrics[-1] if recent_metrics else None
+        current = self.metrics_history[-1]
         
         report = {
             "period_hours": hours,
-            "metrics_count": len(recent_metrics),
+            "metrics_count": metrics_count,
             "current": {
                 "hit_rate": current.hit_rate if current else 0,
                 "response_time": current.avg_response_time if current else 0,
@@ -206,16 +475,16 @@ class CachePerformanceMonitor:
                 "total_operations": current.total_operations if current else 0
             },
             "averages": {
-                "hit_rate": sum(hit_rates) / len(hit_rates),
-                "response_time": sum(response_times) / len(response_times),
-                "effectiveness": sum(effectiveness_scores) / len(effectiveness_scores)
+                "hit_rate": _mean(hit_rates),
+                "response_time": _mean(response_times),
+                "effectiveness": _mean(effectiveness_scores)
             },
             "trends": {
                 "hit_rate_trend": self._calculate_trend(hit_rates),
                 "response_time_trend": self._calculate_trend(response_times),
                 "effectiveness_trend": self._calculate_trend(effectiveness_scores)
             },
-            "recommendations": self._generate_recommendations(recent_metrics)
+            "recommendations": self._generate_recommendations(current, hit_rates)
         }
         
         return report
@@ -225,11 +494,13 @@ class CachePerformanceMonitor:
         if len(values) < 2:
             return "stable"
         
+        if np is not None:
+            values = np.asarray(values, dtype=np.float64)
         first_half = values[:len(values)//2]
         second_half = values[len(values)//2:]
         
-        first_avg = sum(first_half) / len(first_half)
-        second_avg = sum(second_half) / len(second_half)
+        first_avg = _mean(first_half)
+        second_avg = _mean(second_half)
         
         change = (second_avg - first_avg) / first_avg if first_avg > 0 else 0
         
@@ -240,12 +511,9 @@ class CachePerformanceMonitor:
         else:
             return "stable"
     
-    def _generate_recommendations(self, metrics: List[PerformanceMetrics]) -> List[str]:
-        """Generate optimization recommendations"""
-        if not metrics:
-            return []
-        
-        current = metrics[-1]
+    def _generate_recommendations(self, current: PerformanceMetrics, hit_rates) -> List[str]:
+        """Generate optimization recommendations from the latest metrics and
+        the hit rates of the period"""
         recommendations = []
         
         # Hit rate recommendations
@@ -268,7 +536,6 @@ class CachePerformanceMonitor:
             recommendations.append("Low effectiveness - review cache policies and file patterns")
         
         # Trend-based recommendations
-        hit_rates = [m.hit_rate for m in metrics]
         if self._calculate_trend(hit_rates) == "declining":
             recommendations.append("Hit rate declining - check for file changes or cache invalidation issues")
         
@@ -279,7 +546,8 @@ class CachePerformanceMonitor:
     
     def print_live_dashboard(self):
         """Print live performance dashboard"""
-        os.system('clear' if os.name == 'posix' else 'cls')
+        sys.stdout.write(CLEAR_SCREEN)
+        sys.stdout.flush()
         
         print("🚀 Claude Code Cache Performance Dashboard")
         print("=" * 50)
@@ -333,7 +601,7 @@ def main():
         
     elif args.command == "report":
         report = monitor.get_performance_report(args.hours)
-        print(json.dumps(report, indent=2))
+        print(_dumps(report, indent=True).decode('utf-8'))
         
     elif args.command == "analyze":
         report = monitor.get_performance_report(args.hours)
@@ -372,6 +640,8 @@ def main():
             print(f"  {i}. {rec}")
         
     elif args.command == "dashboard":
+        if os.name == 'nt':
+            os.system('')  # Turns on ANSI escape handling in the Windows console
         try:
             while True:
                 monitor.print_live_dashboard()
@@ -0,0 +1,57 @@
+"""Pool threads started from a CPU-pinned thread must not inherit the pin"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from claude_cache_security_enhanced import ClaudeCacheSecurityEnhanced
+
+
+def _in_pinned_thread(func):
+    """Run func in a new thread pinned to one CPU and return its result"""
+    result = {}
+    
+    def run():
+        os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+        result['value'] = func()
+    
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return result['value']
+
+
+@unittest.skipUnless(hasattr(os, 'sched_setaffinity') and len(os.sched_getaffinity(0)) > 1,
+                     "needs Linux CPU affinity and at least two CPUs")
+class PoolAffinityTest(unittest.TestCase):
+    
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        for subdir in ('files', 'partitions', 'config'):
+            os.makedirs(os.path.join(self._tmp.name, subdir))
+        self.cache = ClaudeCacheSecurityEnhanced(cache_dir=self._tmp.name)
+    
+    def tearDown(self):
+        self.cache.cleanup()
+        self._tmp.cleanup()
+    
+    def test_worker_pool_started_from_pinned_thread_uses_all_cpus(self):
+        cpus = _in_pinned_thread(
+            lambda: self.cache._worker_pool(3).submit(os.sched_getaffinity, 0).result()
+        )
+        self.assertEqual(cpus, os.sched_getaffinity(0))
+    
+    def test_io_executor_started_from_pinned_thread_uses_all_cpus(self):
+        cpus = _in_pinned_thread(
+            lambda: self.cache._io_executor.submit(os.sched_getaffinity, 0).result()
+        )
+        self.assertEqual(cpus, os.sched_getaffinity(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+"""The Hyperscan/RE2 prefilters must never hide a match the re count finds"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import claude_cache_security_enhanced as enhanced
+from claude_cache_security_enhanced import SecurityAnalyzer
+
+SAMPLES = {
+    "keyword split by an invalid byte": b'pass\xffword = "hunter2"\n',
+    "ASCII separator re treats as whitespace": b'password\x1c= "hunter2"\n',
+    "Unicode whitespace": 'password = "hunter2"\n'.encode('utf-8'),
+    "Unicode case fold": 'paſsword = "hunter2"\n'.encode('utf-8'),
+    "plain ASCII": b'password = "hunter2"\nimport pickle\npickle.loads(data)\n',
+}
+
+
+def _analyzer(engine):
+    """An analyzer prefiltering with engine ('hyperscan', 're2' or None)"""
+    analyzer = SecurityAnalyzer()
+    analyzer._hs_databases = None
+    analyzer._re2_sets = None
+    if engine == 'hyperscan':
+        analyzer._init_hyperscan()
+    elif engine == 're2':
+        analyzer._init_re2()
+    return analyzer
+
+
+class PrefilterTest(unittest.TestCase):
+    
+    def _check(self, engine):
+        prefiltered = _analyzer(engine)
+        reference = _analyzer(None)
+        for name, content in SAMPLES.items():
+            with self.subTest(sample=name):
+                expected = reference.analyze_content(content, "sample.py")
+                self.assertTrue(expected[1], "sample should trip a pattern")
+                self.assertEqual(prefiltered.analyze_content(content, "sample.py"), expected)
+                self.assertEqual(prefiltered.analyze_content(memoryview(content), "sample.py"), expected)
+    
+    @unittest.skipIf(enhanced.hyperscan is None, "hyperscan not installed")
+    def test_hyperscan_prefilter_agrees_with_re(self):
+        self._check('hyperscan')
+    
+    @unittest.skipIf(enhanced.re2 is None, "re2 not installed")
+    def test_re2_set_prefilter_agrees_with_re(self):
+        self._check('re2')
+
+
+if __name__ == '__main__':
+    unittest.main()